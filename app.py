@@ -1,57 +1,129 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 import openai
 import os
-from datetime import date
+import json
 from layers.layerone_modified import fetch_layer_one
+from chat_context import load_frames, build_briefs, select_context
+import chat_pool
+import chat_cache
+import snapshot_manager
 
-# Load OpenAI API key from environment
+CHAT_MODEL = os.getenv("CHAT_MODEL", "gpt-4")
+
+# Load OpenAI API key from environment (the stub backend runs without one)
 openai.api_key = os.getenv("OPENAI_API_KEY")
-if not openai.api_key:
+if not openai.api_key and chat_pool.MODEL_BACKEND == "openai":
     raise ValueError("❌ Missing OPENAI_API_KEY environment variable.")
 
 # Create app
 app = Flask(__name__)
 
-# Load today’s data once on startup
-today = date.today().isoformat()
-try:
-    layer_one_data = fetch_layer_one(today)
-    print(f"✅ Layer One data loaded for {today}, rows: {len(layer_one_data)}")
-except Exception as e:
-    print(f"⚠️ Failed to load Layer One: {e}")
-    layer_one_data = None
+def load_snapshot(date_str):
+    """
+    Everything /chat needs for one day: the brief layers (layer one from that
+    day's checkpoint, else a live fetch; weather and odds only when
+    checkpointed that day) and one precomputed brief per game. The
+    layer frames are shared between workers as memory-mapped Arrow tables.
+    """
+    frames = load_frames(date_str)
+    if "layerone" not in frames:
+        frames["layerone"] = fetch_layer_one(date_str)
+    print(f"✅ Layer One data loaded for {date_str}, rows: {len(frames['layerone'])}")
+    return {**frames, "briefs": build_briefs(frames)}
+
+# Serves the newest persisted snapshot right away (no fetch at import), then
+# loads in the background and hot-swaps on a new day, new checkpoints or an
+# edited system prompt; across gunicorn workers only one does the load and
+# the rest adopt its snapshot. Requests always read whatever snapshot is live.
+# Started on the first request rather than at import, so under
+# gunicorn --preload every forked worker gets its own refresh thread
+@app.before_request
+def start_snapshots():
+    snapshot_manager.start(load_snapshot)
 
 # Ping route to test uptime
 @app.route("/ping")
 def ping():
     return "pong", 200
 
-# Main chat endpoint
+# Readiness and staleness of the data snapshot; ?strict=1 answers 503 until
+# a snapshot is loaded, for load balancers that should wait for data
+@app.route("/health")
+def health():
+    status = snapshot_manager.status()
+    strict = request.args.get("strict") == "1"
+    return jsonify(status), 503 if strict and not status["ready"] else 200
+
+# Main chat endpoint: JSON by default, server-sent events when the client asks
+# for a stream ("stream": true or Accept: text/event-stream)
 @app.route("/chat", methods=["POST"])
 def chat():
-    user_msg = request.json.get("message", "")
+    body = request.get_json(silent=True) or {}
+    user_msg = body.get("message", "")
+    stream = bool(body.get("stream")) or "text/event-stream" in request.headers.get("Accept", "")
+
+    # One consistent snapshot (prompt + data) for the whole request
+    snap = snapshot_manager.current()
 
-    # Load system prompt
-    try:
-        with open("prompts/system_prompt.txt", "r") as f:
-            system_prompt = f.read()
-    except Exception:
-        system_prompt = "You are Free Agent Analytics. Respond with overlays using loaded data."
+    # Same question, model and snapshot: answer from the cache
+    cache_key = chat_cache.key(user_msg, CHAT_MODEL, snap["version"])
+    cached = chat_cache.get(cache_key)
+    if cached is not None:
+        if stream:
+            events = [("token", cached), ("done", None)]
+            return Response(
+                "".join(f"event: {kind}\ndata: {json.dumps(payload)}\n\n" for kind, payload in events),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Chat-Cache": "hit"}
+            )
+        return jsonify({"response": cached}), 200, {"X-Chat-Cache": "hit"}
 
-    system_prompt += f"\nData snapshot loaded for {today}. Use `layer_one_data` if needed."
+    system_prompt = snap["system_prompt"]
+    if snap["date"] is None:
+        system_prompt += "\nNo data snapshot is loaded yet."
+    else:
+        context = select_context(snap["data"].get("briefs", []), user_msg)
+        system_prompt += f"\nData snapshot loaded for {snap['date']} (v{snap['version']}).\n\n{context}"
 
-    response = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[
+    job = chat_pool.submit(
+        [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_msg}
-        ]
+        ],
+        model=CHAT_MODEL
     )
+    if job is None:
+        return jsonify({"error": "Too many chat requests in flight, retry shortly"}), 429, {"Retry-After": "2"}
 
-    reply = response["choices"][0]["message"]["content"]
+    if stream:
+        def sse():
+            parts = []
+            for kind, payload in chat_pool.events(job):
+                if kind == "token":
+                    parts.append(payload)
+                elif kind == "done":
+                    chat_cache.put(cache_key, "".join(parts))
+                yield f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+        return Response(
+            stream_with_context(sse()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    reply, error = chat_pool.collect(job)
+    if error is not None:
+        status = 504 if error == "deadline exceeded" else 502
+        return jsonify({"error": error, "partial": reply}), status
+    chat_cache.put(cache_key, reply)
     return jsonify({"response": reply})
 
 
+# Chat pool load, for spotting backpressure, and reply cache hit rate
+@app.route("/chat/stats")
+def chat_stats():
+    return jsonify({**chat_pool.stats(), "cache": chat_cache.stats()})
+
+
 # Run server (Render needs this to bind to $PORT)
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
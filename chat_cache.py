@@ -0,0 +1,88 @@
+# chat_cache.py
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from chat_context import TEAM_ABBR
+
+# Finished /chat replies are reused for this long, per worker process
+TTL_SECONDS = float(os.getenv("CHAT_CACHE_TTL_SECONDS", "900"))
+# Least recently used replies are dropped past this many entries
+MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "512"))
+
+_lock = threading.Lock()
+# key -> (stored_at, reply); keys carry the snapshot version they were made under
+_entries = OrderedDict()
+_state = {"version": None}
+_ABBREVIATIONS = set(TEAM_ABBR.values())
+_stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evicted": 0, "invalidated": 0, "stale_puts": 0}
+
+
+def normalize(message: str) -> str:
+    """
+    Collapses whitespace and trailing punctuation, and lowercases every word
+    but team abbreviations: "SD" selects a game's context where "sd" does
+    not, so those two questions must not share a reply.
+    """
+    words = message.rstrip("?!. ").split()
+    return " ".join(w if w in _ABBREVIATIONS else w.lower() for w in words)
+
+
+def key(message: str, model: str, version: int) -> tuple:
+    return (normalize(message), model, version)
+
+
+def _sync_version(version: int) -> bool:
+    """
+    Moves the cache forward to version: a new snapshot (data or system
+    prompt) makes every stored reply stale. A request that started before
+    the swap still carries the older version; it must not roll the cache
+    back, so returns False for it.
+    """
+    if _state["version"] is not None and version < _state["version"]:
+        return False
+    if version != _state["version"]:
+        _stats["invalidated"] += len(_entries)
+        _entries.clear()
+        _state["version"] = version
+    return True
+
+
+def get(cache_key: tuple):
+    """The cached reply for cache_key, or None."""
+    with _lock:
+        entry = _entries.get(cache_key) if _sync_version(cache_key[-1]) else None
+        if entry is not None and time.monotonic() - entry[0] > TTL_SECONDS:
+            del _entries[cache_key]
+            _stats["expired"] += 1
+            entry = None
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(cache_key)
+        _stats["hits"] += 1
+        return entry[1]
+
+
+def put(cache_key: tuple, reply: str) -> None:
+    """Stores a finished reply; one made under an older snapshot is dropped."""
+    with _lock:
+        if not _sync_version(cache_key[-1]):
+            _stats["stale_puts"] += 1
+            return
+        _entries[cache_key] = (time.monotonic(), reply)
+        _entries.move_to_end(cache_key)
+        _stats["stores"] += 1
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _stats["evicted"] += 1
+
+
+def stats() -> dict:
+    with _lock:
+        counts = dict(_stats)
+        counts["entries"] = len(_entries)
+    lookups = counts["hits"] + counts["misses"]
+    counts["hit_rate"] = round(counts["hits"] / lookups, 3) if lookups else None
+    return counts
@@ -0,0 +1,232 @@
+# chat_context.py
+
+import os
+import re
+import pandas as pd
+from query import CHECKPOINT_NAME, latest_checkpoints
+
+# Rough prompt budget for the data block appended to the system prompt
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKENS", "1500"))
+
+# Layers a game brief draws on, read from their checkpoints; app.load_snapshot
+# fetches layer one live when it has none
+BRIEF_LAYERS = ["layerone", "layerfour", "layerseven", "layereight", "layer12"]
+# Games, weather and odds describe one day's slate, so only that day's checkpoint
+# will do; the rolling-window layers (four, seven) may come from an earlier day
+SLATE_LAYERS = {"layerone", "layereight", "layer12"}
+
+# Full names (StatsAPI and Odds API spellings) -> Statcast abbreviations
+TEAM_ABBR = {
+    "Arizona Diamondbacks": "AZ",   "Atlanta Braves": "ATL",        "Baltimore Orioles": "BAL",
+    "Boston Red Sox": "BOS",        "Chicago Cubs": "CHC",          "Chicago White Sox": "CWS",
+    "Cincinnati Reds": "CIN",       "Cleveland Guardians": "CLE",   "Colorado Rockies": "COL",
+    "Detroit Tigers": "DET",        "Houston Astros": "HOU",        "Kansas City Royals": "KC",
+    "Los Angeles Angels": "LAA",    "Los Angeles Dodgers": "LAD",   "Miami Marlins": "MIA",
+    "Milwaukee Brewers": "MIL",     "Minnesota Twins": "MIN",       "New York Mets": "NYM",
+    "New York Yankees": "NYY",      "Athletics": "ATH",             "Oakland Athletics": "ATH",
+    "Philadelphia Phillies": "PHI", "Pittsburgh Pirates": "PIT",    "San Diego Padres": "SD",
+    "San Francisco Giants": "SF",   "Seattle Mariners": "SEA",      "St. Louis Cardinals": "STL",
+    "Tampa Bay Rays": "TB",         "Texas Rangers": "TEX",         "Toronto Blue Jays": "TOR",
+    "Washington Nationals": "WSH",
+}
+
+# Nicknames that are more than the last word of the full name
+TWO_WORD_NICKNAMES = {"Red Sox", "White Sox", "Blue Jays"}
+
+# Name suffixes that are not a player's surname
+NAME_SUFFIXES = {"jr", "jr.", "sr", "sr.", "ii", "iii", "iv"}
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token, close enough for budgeting English + numbers."""
+    return len(text) // 4 + 1
+
+
+def _fmt(value) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return "n/a"
+    if isinstance(value, (int, float)):
+        if abs(value) >= 100:
+            return f"{value:.0f}"
+        if abs(value) >= 10:
+            return f"{value:.1f}"
+        return f"{value:.3g}"
+    return str(value)
+
+
+def _nickname(team: str) -> str:
+    for nick in TWO_WORD_NICKNAMES:
+        if team.endswith(nick):
+            return nick
+    return team.split()[-1]
+
+
+def load_frames(date_str: str) -> dict:
+    """
+    Newest checkpoint of each brief layer on or before date_str; a slate
+    layer is left out unless its checkpoint is dated date_str itself.
+    """
+    frames = {}
+    paths = latest_checkpoints(date_str)
+    for layer in BRIEF_LAYERS:
+        if layer not in paths:
+            continue
+        if layer in SLATE_LAYERS and CHECKPOINT_NAME.match(os.path.basename(paths[layer])).group("date") != date_str:
+            print(f"⚠️ No {layer} checkpoint for {date_str}; leaving it out")
+            continue
+        try:
+            frames[layer] = pd.read_parquet(paths[layer])
+        except Exception as e:
+            print(f"⚠️ Could not read {layer} checkpoint: {e}")
+    return frames
+
+
+def _rows_by(df: pd.DataFrame, column: str) -> dict:
+    if df is None or df.empty or column not in df.columns:
+        return {}
+    return {key: group for key, group in df.groupby(column)}
+
+
+def _pitcher_line(side: str, game, pitchers: dict) -> tuple:
+    name = game.get(f"{side} Pitcher")
+    pid = game.get(f"{side} Pitcher ID")
+    if name is None or pd.isna(name):
+        return f"{side}: TBD", []
+    parts = [
+        f"velo {_fmt(game.get(f'{side} Velo'))}",
+        f"K% {_fmt(game.get(f'{side} K %'))}",
+        f"BB% {_fmt(game.get(f'{side} BB %'))}",
+        f"xwOBA {_fmt(game.get(f'{side} xwOBA'))}",
+    ]
+    line = f"{side}: {name} ({', '.join(parts)})"
+
+    extra = []
+    four = pitchers.get(pid)
+    if four is not None:
+        row = four.iloc[0]
+        extra.append(
+            f"  {name} contact: HardHit% {_fmt(row.get('HardHit%'))}, Barrel% {_fmt(row.get('Barrel%'))}, "
+            f"spin {_fmt(row.get('Avg Spin Rate'))}"
+        )
+    return line, extra
+
+
+def _odds_line(odds: pd.DataFrame, away_abbr: str, home_abbr: str) -> str:
+    if odds is None or odds.empty:
+        return None
+    game = odds[
+        (odds["AwayTeam"].map(TEAM_ABBR) == away_abbr) & (odds["HomeTeam"].map(TEAM_ABBR) == home_abbr)
+    ]
+    if game.empty:
+        return None
+    book = sorted(game["Bookmaker"].dropna().unique())[0]
+    game = game[game["Bookmaker"] == book]
+    parts = []
+    for _, r in game.iterrows():
+        if r["MarketType"] == "h2h":
+            parts.append(f"{TEAM_ABBR.get(r['TeamOrPlayer'], r['TeamOrPlayer'])} {_fmt(r['Odds'])}")
+        elif r["MarketType"] == "totals" and r["TeamOrPlayer"] == "Over":
+            parts.append(f"total {_fmt(r['Line'])}")
+    return f"Odds ({book}): {', '.join(parts)}" if parts else None
+
+
+def build_briefs(frames: dict) -> list:
+    """
+    One compact text brief per game on the slate: probable pitchers and their
+    contact profile, both bullpens, weather and odds. Returns a list of
+    {"teams", "players", "text"} dicts in game-time order, ready for select_context.
+    """
+    games = frames.get("layerone")
+    required = {"Game Time (UTC)", "Away Team", "Home Team"}
+    if games is None or games.empty or not required <= set(games.columns):
+        return []
+
+    pitchers = _rows_by(frames.get("layerfour"), "Pitcher ID")
+    bullpens = _rows_by(frames.get("layerseven"), "Team")
+    weather = frames.get("layereight")
+    odds = frames.get("layer12")
+
+    briefs = []
+    for _, game in games.sort_values("Game Time (UTC)").iterrows():
+        away, home = game["Away Team"], game["Home Team"]
+        away_abbr, home_abbr = TEAM_ABBR.get(away, away), TEAM_ABBR.get(home, home)
+        lines = [f"{away} ({away_abbr}) @ {home} ({home_abbr}), {game['Game Time (UTC)']}"]
+
+        players = []
+        for side in ("Away", "Home"):
+            line, extra = _pitcher_line(side, game, pitchers)
+            lines.append(line)
+            lines.extend(extra)
+            if not pd.isna(game.get(f"{side} Pitcher")):
+                players.append(game[f"{side} Pitcher"])
+
+        pens = []
+        for abbr in (away_abbr, home_abbr):
+            pen = bullpens.get(abbr)
+            if pen is not None:
+                r = pen.iloc[0]
+                pens.append(
+                    f"{abbr} K% {_fmt(r.get('K%'))}, BB% {_fmt(r.get('BB%'))}, "
+                    f"xwOBA {_fmt(r.get('xwOBA'))}, HR/9 {_fmt(r.get('HR/9'))}"
+                )
+        if pens:
+            lines.append(f"Bullpens (365d): {' | '.join(pens)}")
+
+        if weather is not None and not weather.empty:
+            w = weather[
+                (weather["Home Team"] == home) & (weather["Game Time (UTC)"] == game["Game Time (UTC)"])
+            ]
+            if not w.empty:
+                r = w.iloc[0]
+                lines.append(
+                    f"Weather: {_fmt(r.get('Condition'))}, {_fmt(r.get('Temp (F)'))}F, "
+                    f"wind {_fmt(r.get('Wind (text)'))}"
+                )
+
+        odds_line = _odds_line(odds, away_abbr, home_abbr)
+        if odds_line:
+            lines.append(odds_line)
+
+        briefs.append({
+            "teams":   sorted({away, home, away_abbr, home_abbr, _nickname(away), _nickname(home)}),
+            "players": sorted(set(players)),
+            "text":    "\n".join(lines),
+        })
+    return briefs
+
+
+def _mentions(question: str, brief: dict) -> bool:
+    lowered = question.lower()
+    for team in brief["teams"]:
+        # Abbreviations only count in capitals ("SD", not "sd"); names in any case
+        if team.isupper():
+            if re.search(rf"\b{re.escape(team)}\b", question):
+                return True
+        elif re.search(rf"\b{re.escape(team.lower())}\b", lowered):
+            return True
+    for player in brief["players"]:
+        names = [w for w in player.split() if w.lower() not in NAME_SUFFIXES] or player.split()
+        last = names[-1].lower()
+        if re.search(rf"\b{re.escape(player.lower())}\b", lowered) or re.search(rf"\b{re.escape(last)}\b", lowered):
+            return True
+    return False
+
+
+def select_context(briefs: list, question: str, token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """
+    Briefs for the games the question mentions (by team, nickname,
+    abbreviation or pitcher), or the whole slate when it names none,
+    packed in game-time order until token_budget is reached.
+    """
+    chosen = [b for b in briefs if _mentions(question, b)] or briefs
+    parts, used, skipped = [], 0, 0
+    for brief in chosen:
+        cost = estimate_tokens(brief["text"]) + 1
+        if used + cost > token_budget:
+            skipped += 1
+            continue
+        parts.append(brief["text"])
+        used += cost
+    if skipped:
+        parts.append(f"({skipped} more game(s) omitted to fit the context budget)")
+    return "\n\n".join(parts)
@@ -0,0 +1,164 @@
+# chat_pool.py
+
+import os
+import re
+import time
+import queue
+import threading
+import openai
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _web_threads() -> int:
+    """Request threads per web worker process: WEB_THREADS, else gunicorn's --threads."""
+    if os.getenv("WEB_THREADS"):
+        return int(os.getenv("WEB_THREADS"))
+    m = re.search(r"--threads[=\s]+(\d+)", os.getenv("GUNICORN_CMD_ARGS", ""))
+    return int(m.group(1)) if m else 8
+
+
+# Model calls run on a bounded pool, but the web thread that took the
+# request still waits on it (or streams from it) until the reply is done.
+# Admitted chats (in flight + queued) are therefore capped below the web
+# server's threads per process, keeping RESERVED_THREADS free for /ping
+# and /health; the 429 fires before the web worker saturates.
+WEB_THREADS = _web_threads()
+RESERVED_THREADS = 1
+MAX_ADMITTED = max(1, WEB_THREADS - RESERVED_THREADS)
+# Share of the admitted slots held back for queued requests, so a short burst
+# waits for a model slot instead of being turned away at once
+QUEUE_SHARE = float(os.getenv("CHAT_QUEUE_SHARE", "0.25"))
+QUEUE_SLOTS = min(MAX_ADMITTED - 1, max(1, round(MAX_ADMITTED * QUEUE_SHARE)))
+MAX_IN_FLIGHT = min(int(os.getenv("CHAT_MAX_IN_FLIGHT", "8")), MAX_ADMITTED - QUEUE_SLOTS)
+# Requests allowed to wait for a slot; anything beyond is turned away with a 429
+MAX_QUEUE = min(int(os.getenv("CHAT_MAX_QUEUE", "16")), MAX_ADMITTED - MAX_IN_FLIGHT)
+# Wall-clock budget per request, queueing included
+DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "60"))
+
+# "openai" for the real model, "stub" for a local canned streamer (tests, load checks)
+MODEL_BACKEND = os.getenv("CHAT_MODEL_BACKEND", "openai")
+STUB_TOKEN_DELAY = float(os.getenv("CHAT_STUB_TOKEN_DELAY", "0.02"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT, thread_name_prefix="chat")
+_lock = threading.Lock()
+_stats = {"admitted": 0, "rejected": 0, "completed": 0, "failed": 0, "timed_out": 0}
+_active = 0
+
+
+def openai_stream(messages: list, model: str, timeout: float):
+    """Yields content deltas from the (legacy) ChatCompletion streaming API."""
+    response = openai.ChatCompletion.create(
+        model=model,
+        messages=messages,
+        stream=True,
+        request_timeout=timeout
+    )
+    for chunk in response:
+        content = chunk["choices"][0].get("delta", {}).get("content")
+        if content:
+            yield content
+
+
+def stub_stream(messages: list, model: str, timeout: float):
+    """Local stand-in for the model: echoes the question back word by word."""
+    words = f"Stub reply from {model} to: {messages[-1]['content']}".split(" ")
+    for i, word in enumerate(words):
+        time.sleep(STUB_TOKEN_DELAY)
+        yield word if i == 0 else f" {word}"
+
+
+BACKENDS = {"openai": openai_stream, "stub": stub_stream}
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def stats() -> dict:
+    with _lock:
+        counts = dict(_stats)
+        active = _active
+    counts["in_flight"] = min(active, MAX_IN_FLIGHT)
+    counts["queued"] = max(0, active - MAX_IN_FLIGHT)
+    return counts
+
+
+def submit(messages: list, model: str, deadline_seconds: float = DEADLINE_SECONDS):
+    """
+    Queues a completion on the pool. Returns a job dict to read events from,
+    or None when in-flight plus queued requests are already at capacity.
+    """
+    global _active
+    with _lock:
+        if _active >= MAX_IN_FLIGHT + MAX_QUEUE:
+            _stats["rejected"] += 1
+            return None
+        _active += 1
+        _stats["admitted"] += 1
+
+    job = {
+        "events":   queue.Queue(),
+        "cancel":   threading.Event(),
+        "deadline": time.monotonic() + deadline_seconds,
+    }
+
+    def run():
+        global _active
+        try:
+            # Waited out its whole budget in the queue, or the client went away
+            remaining = job["deadline"] - time.monotonic()
+            if job["cancel"].is_set() or remaining <= 0:
+                return
+            for token in BACKENDS[MODEL_BACKEND](messages, model, remaining):
+                if job["cancel"].is_set():
+                    return
+                job["events"].put(("token", token))
+            job["events"].put(("done", None))
+        except Exception as e:
+            job["events"].put(("error", str(e)))
+        finally:
+            with _lock:
+                _active -= 1
+
+    _executor.submit(run)
+    return job
+
+
+def events(job: dict):
+    """
+    Yields (kind, payload) pairs as the model produces them: ("token", text)
+    then ("done", None), or a final ("error", message) on failure or when the
+    deadline passes. Stopping early cancels the completion.
+    """
+    try:
+        while True:
+            remaining = job["deadline"] - time.monotonic()
+            if remaining <= 0:
+                _count("timed_out")
+                yield "error", "deadline exceeded"
+                return
+            try:
+                kind, payload = job["events"].get(timeout=remaining)
+            except queue.Empty:
+                continue
+            yield kind, payload
+            if kind == "done":
+                _count("completed")
+                return
+            if kind == "error":
+                _count("failed")
+                return
+    finally:
+        job["cancel"].set()
+
+
+def collect(job: dict) -> tuple:
+    """Waits for the whole reply. Returns (text, None) or (partial text, error)."""
+    parts = []
+    for kind, payload in events(job):
+        if kind == "token":
+            parts.append(payload)
+        elif kind == "error":
+            return "".join(parts), payload
+    return "".join(parts), None
@@ -0,0 +1,197 @@
+# delta.py
+
+import os
+import re
+import json
+import time
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+from table_schema import PRIMARY_KEYS, TABLE_NAMES
+from layer_checkpoints import PUBLISHED_FILE
+
+# One JSON line per layer per run: what changed against the previous snapshot
+CHANGES_LOG = "changes.jsonl"
+
+
+def _normalized(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    # Parquet round-trips can turn int into float or text into categoricals;
+    # neither should count as a change
+    out = df[columns].copy()
+    for col in columns:
+        if is_numeric_dtype(out[col].dtype) and not is_bool_dtype(out[col].dtype):
+            out[col] = out[col].astype("float64")
+        else:
+            out[col] = out[col].astype(object).where(out[col].notna(), None)
+    return out
+
+
+def _row_hashes(df: pd.DataFrame, keys: list, values: list) -> pd.Series:
+    index = pd.MultiIndex.from_frame(_normalized(df, keys))
+    if not values:
+        return pd.Series(0, index=index, dtype="uint64")
+    hashes = pd.util.hash_pandas_object(_normalized(df, values), index=False)
+    return pd.Series(hashes.values, index=index)
+
+
+def diff_frames(prev: pd.DataFrame, curr: pd.DataFrame, keys: list) -> dict:
+    """
+    Row-hash diff of two snapshots of a layer on its key columns.
+    Returns {"inserted", "updated", "deleted"}: new and changed rows from curr,
+    and the key columns of rows that disappeared from prev.
+    """
+    curr = curr.drop_duplicates(subset=keys, keep="last").reset_index(drop=True)
+    prev = (
+        prev.drop_duplicates(subset=keys, keep="last")
+            .reindex(columns=curr.columns)
+            .reset_index(drop=True)
+    )
+    values = [col for col in curr.columns if col not in keys]
+    prev_hash = _row_hashes(prev, keys, values)
+    curr_hash = _row_hashes(curr, keys, values)
+
+    existed = curr_hash.index.isin(prev_hash.index)
+    changed = existed & (curr_hash.values != prev_hash.reindex(curr_hash.index).values)
+    return {
+        "inserted": curr[~existed],
+        "updated":  curr[changed],
+        "deleted":  prev.loc[~prev_hash.index.isin(curr_hash.index), keys],
+    }
+
+
+def previous_checkpoint(layer_name: str, date_str: str, checkpoint_dir: str = "checkpoints"):
+    """Path of the newest checkpoint for layer_name dated before date_str, or None."""
+    pattern = re.compile(rf"^{re.escape(layer_name)}_(\d{{4}}-\d{{2}}-\d{{2}})(?:_[0-9a-f]+)?\.parquet$")
+    dated = []
+    if os.path.isdir(checkpoint_dir):
+        for name in os.listdir(checkpoint_dir):
+            m = pattern.match(name)
+            if m and m.group(1) < date_str:
+                dated.append((m.group(1), name))
+    return os.path.join(checkpoint_dir, max(dated)[1]) if dated else None
+
+
+def load_published(checkpoint_dir: str = "checkpoints") -> dict:
+    """{layer: {"checkpoint", "date", "published_at"}} for every layer published so far."""
+    try:
+        with open(os.path.join(checkpoint_dir, PUBLISHED_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _mark_published(layer_name: str, checkpoint: str, date_str: str, checkpoint_dir: str) -> None:
+    published = load_published(checkpoint_dir)
+    published[layer_name] = {
+        "checkpoint":   os.path.basename(checkpoint),
+        "date":         date_str,
+        "published_at": pd.Timestamp.now(tz="UTC").isoformat(),
+    }
+    path = os.path.join(checkpoint_dir, PUBLISHED_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(published, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _baseline(layer_name: str, date_str: str, checkpoint_dir: str, publish: bool, published: dict):
+    """
+    Path of the snapshot to diff against: with publish, the checkpoint last
+    published to the database (None, i.e. publish every row, if there is
+    none or it is gone); otherwise the previous checkpoint.
+    """
+    if not publish:
+        return previous_checkpoint(layer_name, date_str, checkpoint_dir)
+    entry = published.get(layer_name)
+    if entry is None:
+        return None
+    path = os.path.join(checkpoint_dir, entry["checkpoint"])
+    return path if os.path.exists(path) else None
+
+
+def _publish(layer_name: str, changes: dict, keys: list) -> None:
+    from upsert import upsert_df, delete_keys
+
+    table_name = TABLE_NAMES.get(layer_name, layer_name)
+    changed = pd.concat([changes["inserted"], changes["updated"]], ignore_index=True)
+    if not changed.empty:
+        upsert_df(changed, table_name, keys)
+    if not changes["deleted"].empty:
+        delete_keys(changes["deleted"], table_name, keys)
+
+
+def publish_changes(
+    frames: dict,
+    date_str: str,
+    checkpoint_dir: str = "checkpoints",
+    publish: bool = False,
+    checkpoints: dict = None
+) -> list:
+    """
+    Diffs each keyed layer against its previous checkpoint, writes the changed
+    rows to <layer>_<date>.delta.parquet (with a _change column) for downstream
+    consumers, and appends a line per layer to the changes log.
+    With publish=True the diff is taken against the checkpoint last published
+    instead, so layers never published (or whose last publish failed) catch
+    up, and only those rows are upserted to / deleted from the database.
+    checkpoints ({layer: path} of this run's checkpoints) is what gets
+    recorded as published. Returns the log entries.
+    """
+    checkpoints = checkpoints or {}
+    published = load_published(checkpoint_dir)
+    entries = []
+    for layer_name, df in frames.items():
+        keys = PRIMARY_KEYS.get(layer_name)
+        if df.empty or not keys or not set(keys) <= set(df.columns):
+            continue
+
+        started = time.perf_counter()
+        prev_path = _baseline(layer_name, date_str, checkpoint_dir, publish, published)
+        prev = pd.read_parquet(prev_path) if prev_path else df.head(0)
+        changes = diff_frames(prev, df, keys)
+
+        delta = pd.concat(
+            [frame.assign(_change=kind) for kind, frame in changes.items()],
+            ignore_index=True
+        )
+        delta_path = os.path.join(checkpoint_dir, f"{layer_name}_{date_str}.delta.parquet")
+        try:
+            delta.to_parquet(delta_path, index=False)
+        except Exception as e:
+            print(f"⚠️  Could not write delta for {layer_name}: {e}")
+
+        done = False
+        if publish:
+            try:
+                _publish(layer_name, changes, keys)
+                done = True
+            except Exception as e:
+                print(f"⚠️  Could not publish {layer_name}, it will catch up next run: {e}")
+            checkpoint = checkpoints.get(layer_name)
+            if done and checkpoint and os.path.exists(checkpoint):
+                _mark_published(layer_name, checkpoint, date_str, checkpoint_dir)
+
+        entry = {
+            "run_at":    pd.Timestamp.now(tz="UTC").isoformat(),
+            "date":      date_str,
+            "layer":     layer_name,
+            "previous":  os.path.basename(prev_path) if prev_path else None,
+            "rows":      len(df),
+            "inserted":  len(changes["inserted"]),
+            "updated":   len(changes["updated"]),
+            "deleted":   len(changes["deleted"]),
+            "published": done,
+            "seconds":   round(time.perf_counter() - started, 3),
+        }
+        entry["unchanged"] = entry["rows"] - entry["inserted"] - entry["updated"]
+        entries.append(entry)
+        print(
+            f"Δ {layer_name}: +{entry['inserted']} ~{entry['updated']} -{entry['deleted']} "
+            f"({entry['unchanged']} unchanged)"
+        )
+
+    if entries:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        with open(os.path.join(checkpoint_dir, CHANGES_LOG), "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+    return entries
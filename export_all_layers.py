@@ -3,7 +3,7 @@
 import os
 import pandas as pd
 import inspect
-from datetime import date
+from datetime import date, timedelta
 
 # -------------- IMPORT YOUR UPDATED LAYER FUNCTIONS ------------
 # Each layerX function should itself:
@@ -13,15 +13,105 @@ from datetime import date
 from layerone      import fetch_layer_one      as fetch_layerone
 
 from layerthreeA   import fetch_layer_threeA   as fetch_layerthreeA
-from layerfour     import fetch_layer_four     as fetch_layerfour
-from layerfive     import fetch_layer_five     as fetch_layerfive
 from layersix      import fetch_layer_six      as fetch_layersix
-from layerseven    import fetch_layer_seven    as fetch_layerseven
 from layereight    import fetch_layer_eight    as fetch_layereight
 from layerten      import fetch_layer_ten      as fetch_layerten
-from layereleven   import fetch_layer_eleven   as fetch_layereleven
 from layer12       import fetch_layer_twelve   as fetch_layertwelve
-from layer13       import fetch_layer_thirteen as fetch_layerthirteen
+
+# Imported for their register_layer() side effect; built by the engine below
+import layerfour    # pylint: disable=unused-import
+import layerfive    # pylint: disable=unused-import
+import layerseven   # pylint: disable=unused-import
+import layereleven  # pylint: disable=unused-import
+import layer13      # pylint: disable=unused-import
+from statcast_engine import build_layers, LAYERS as STATCAST_SPECS
+from statcast_store import ensure_window
+from schedule_snapshot import get_schedule
+from layer_scheduler import add_task, run_tasks
+from table_schema import check_drift, load_manifest, SCHEMA_PATH
+from delta import publish_changes
+import layer_checkpoints
+from exporters import export_all
+import http_cache
+
+# Statcast layers registered with the engine; missing ones are built together in one scan
+STATCAST_LAYERS = ["layerfour", "layerfive", "layerseven", "layereleven", "layer13"]
+
+# Layers fetched on their own
+LAYER_FETCHERS = {
+    "layerone":    fetch_layerone,
+    "layerthreeA": fetch_layerthreeA,
+    "layersix":    fetch_layersix,
+    "layereight":  fetch_layereight,
+    "layerten":    fetch_layerten,
+    "layer12":     fetch_layertwelve,
+}
+
+# Inputs each layer reads, in export order; shared inputs are their own DAG nodes
+LAYER_INPUTS = {
+    "layerone":    ["schedule", "statcast_window"],
+    "layerthreeA": [],
+    "layerfour":   ["statcast_layers"],
+    "layerfive":   ["statcast_layers"],
+    "layersix":    ["schedule", "statcast_window"],
+    "layerseven":  ["statcast_layers"],
+    "layereight":  ["schedule"],
+    "layerten":    [],
+    "layereleven": ["statcast_layers"],
+    "layer12":     [],
+    "layer13":     ["statcast_layers"],
+}
+
+# Most layers are I/O bound, so a small thread pool covers them
+MAX_WORKERS = int(os.getenv("EXPORT_MAX_WORKERS", "4"))
+
+# Look-back window (days) of the non-engine layers that read history
+LAYER_WINDOW_DAYS = {
+    "layerone": 365,
+    "layersix": 365,
+}
+
+# Modules besides the layer's own whose code changes invalidate its checkpoint
+STATCAST_SOURCES = ["statcast_engine", "statcast_store", "statcast_dtypes"]
+LAYER_SOURCES = {
+    "layerone":   ["schedule_snapshot", "statcast_store"],
+    "layersix":   ["schedule_snapshot", "overlay_cache"],
+    "layereight": ["schedule_snapshot"],
+}
+
+# Declared columns per layer, part of each checkpoint's fingerprint
+_SCHEMA = load_manifest() if os.path.exists(SCHEMA_PATH) else {}
+
+# Send only rows that changed since the previous checkpoint to the database
+PUBLISH_DB = os.getenv("EXPORT_PUBLISH_DB", "0") == "1"
+
+
+def checkpoint_key(layer_name, date_str):
+    """
+    Fingerprint for a layer's checkpoint: its run date, input window, the
+    code of the modules that build it and its declared columns.
+    Returns (fingerprint, inputs).
+    """
+    if layer_name in STATCAST_SPECS:
+        days = STATCAST_SPECS[layer_name]["days"]
+        sources = [layer_name] + STATCAST_SOURCES
+    else:
+        days = LAYER_WINDOW_DAYS.get(layer_name, 0)
+        sources = [layer_name] + LAYER_SOURCES.get(layer_name, [])
+    end = date.fromisoformat(date_str)
+    schema = _SCHEMA.get(layer_name, {}).get("columns")
+    return layer_checkpoints.fingerprint(
+        layer_name,
+        params={"date": date_str},
+        window=(end - timedelta(days=days), end),
+        sources=sources,
+        schema=schema
+    )
+
+
+def checkpoint_path(layer_name, date_str, checkpoint_dir="checkpoints"):
+    fp, _ = checkpoint_key(layer_name, date_str)
+    return layer_checkpoints.checkpoint_path(layer_name, date_str, fp, checkpoint_dir)
 
 
 def load_or_fetch(layer_name, fetch_fn, date_str, checkpoint_dir="checkpoints"):
@@ -33,7 +123,8 @@ def load_or_fetch(layer_name, fetch_fn, date_str, checkpoint_dir="checkpoints"):
        Save the resulting DataFrame to parquet and return it.
     """
     os.makedirs(checkpoint_dir, exist_ok=True)
-    filepath = os.path.join(checkpoint_dir, f"{layer_name}_{date_str}.parquet")
+    fp, inputs = checkpoint_key(layer_name, date_str)
+    filepath = layer_checkpoints.checkpoint_path(layer_name, date_str, fp, checkpoint_dir)
 
     # If checkpoint exists, load it immediately
     if os.path.exists(filepath):
@@ -53,6 +144,7 @@ def load_or_fetch(layer_name, fetch_fn, date_str, checkpoint_dir="checkpoints"):
     # Attempt to write checkpoint
     try:
         df.to_parquet(filepath, index=False)
+        layer_checkpoints.record(filepath, inputs, len(df))
         print(f"✅ Checkpointed {layer_name} → {filepath}")
     except Exception as e:
         print(f"⚠️  Could not write checkpoint for {layer_name}: {e}")
@@ -60,51 +152,99 @@ def load_or_fetch(layer_name, fetch_fn, date_str, checkpoint_dir="checkpoints"):
     return df
 
 
-def main():
+def _built_layer(built, name):
+    # Zero-argument fetcher, so load_or_fetch doesn't pass it the date
+    return lambda: built[name]
+
+
+def build_tasks(today_str):
+    """
+    Declares the export DAG: input nodes (schedule snapshot, Statcast window)
+    and one node per layer that depends on its inputs.
+    """
+    tasks = {}
+    add_task(tasks, "schedule", lambda: get_schedule(today_str))
+
+    # The store is filled once, before any layer reads it, for the longest
+    # window among the layers that still have to be built
+    unbuilt = [
+        name for name, inputs in LAYER_INPUTS.items()
+        if ("statcast_window" in inputs or name in STATCAST_LAYERS)
+        and not os.path.exists(checkpoint_path(name, today_str))
+    ]
+    if unbuilt:
+        longest = max(
+            STATCAST_SPECS[name]["days"] if name in STATCAST_SPECS else LAYER_WINDOW_DAYS[name]
+            for name in unbuilt
+        )
+        start = (date.fromisoformat(today_str) - timedelta(days=longest)).isoformat()
+        add_task(tasks, "statcast_window", lambda: ensure_window(start, today_str))
+    else:
+        add_task(tasks, "statcast_window")
+
+    # Every Statcast layer without a checkpoint is built together in one scan
+    pending = [name for name in STATCAST_LAYERS if name in unbuilt]
+    built = {}
+    if pending:
+        add_task(
+            tasks, "statcast_layers",
+            lambda: built.update(build_layers(today_str, pending)),
+            deps=["statcast_window"]
+        )
+    else:
+        add_task(tasks, "statcast_layers")
+
+    for name, inputs in LAYER_INPUTS.items():
+        if name in STATCAST_LAYERS:
+            fetch_fn = _built_layer(built, name)
+        else:
+            fetch_fn = LAYER_FETCHERS[name]
+        add_task(
+            tasks, name,
+            lambda name=name, fetch_fn=fetch_fn: load_or_fetch(name, fetch_fn, today_str),
+            deps=inputs
+        )
+    return tasks
+
+
+def main(max_workers=MAX_WORKERS, publish=PUBLISH_DB):
     today_str = date.today().strftime("%Y-%m-%d")
 
-    # 1) Fetch each layer—but load from disk if checkpoint already exists
-    df1  = load_or_fetch("layerone",     fetch_layerone,     today_str)
-    
-    df3  = load_or_fetch("layerthreeA",  fetch_layerthreeA,  today_str)
-    df4  = load_or_fetch("layerfour",    fetch_layerfour,    today_str)
-    df5  = load_or_fetch("layerfive",    fetch_layerfive,    today_str)
-    df6  = load_or_fetch("layersix",     fetch_layersix,     today_str)
-    df7  = load_or_fetch("layerseven",   fetch_layerseven,   today_str)
-    df8  = load_or_fetch("layereight",   fetch_layereight,   today_str)
-    df10 = load_or_fetch("layerten",     fetch_layerten,     today_str)
-    df11 = load_or_fetch("layereleven",  fetch_layereleven,  today_str)
-    df12 = load_or_fetch("layer12",      fetch_layertwelve,  today_str)
-    df13 = load_or_fetch("layer13",      fetch_layerthirteen, today_str)
+    # 1) Run every layer as soon as its inputs are ready—loading from disk
+    #    when a checkpoint already exists
+    results, _, errors = run_tasks(build_tasks(today_str), max_workers=max_workers)
 
     # 2) Gather them all into a dict for writing
     all_dfs = {
-        "layerone":     df1,
-        
-        "layerthreeA":  df3,
-        "layerfour":    df4,
-        "layerfive":    df5,
-        "layersix":     df6,
-        "layerseven":   df7,
-        "layereight":   df8,
-        "layerten":     df10,
-        "layereleven":  df11,
-        "layer12":      df12,
-        "layer13":      df13,
+        name: results[name] if name not in errors else pd.DataFrame()
+        for name in LAYER_INPUTS
     }
 
-    # 3) Write them all into an Excel file—just once, at the end
-    output_file = f"all_layers_{today_str}.xlsx"
-    with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
+    # Flag layers whose columns no longer match data_schema.json
+    if _SCHEMA:
         for layer_name, df in all_dfs.items():
-            if not df.empty:
-                df.to_excel(writer, sheet_name=layer_name, index=False)
-            else:
-                # create a one-row sheet if no data
-                pd.DataFrame({"Message": [f"No data for {layer_name}"]}) \
-                  .to_excel(writer, sheet_name=layer_name, index=False)
-
-    print(f"🏁 Done. Exported all layers to {output_file}")
+            if df.empty or layer_name not in _SCHEMA:
+                continue
+            drift = check_drift(layer_name, df, _SCHEMA)
+            if any(drift.values()):
+                print(f"⚠️ Schema drift in {layer_name}: {drift}")
+
+    # Row-level changes against each layer's previous (or, when publishing,
+    # last published) checkpoint
+    publish_changes(
+        all_dfs, today_str, publish=publish,
+        checkpoints={name: checkpoint_path(name, today_str) for name in all_dfs}
+    )
+
+    # 3) Write them to every configured target (EXPORT_FORMATS)—just once, at the end
+    written = export_all(all_dfs, today_str)
+
+    removed = layer_checkpoints.gc()
+    if removed:
+        print(f"🧹 Removed {len(removed)} expired checkpoint file(s)")
+
+    print(f"🌐 HTTP cache: {http_cache.stats()}")
+    print(f"🏁 Done. Exported all layers to {', '.join(written.values())}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+# exporters.py
+
+import os
+import sqlite3
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+# Where every exporter writes, one target per format:
+#   exports/dataset/layer=<name>/date=<YYYY-MM-DD>/part.parquet
+#   exports/layers_<date>.duckdb | .sqlite
+#   exports/arrow/<layer>_<date>.arrow
+#   exports/all_layers_<date>.xlsx
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+
+# Formats written by default; Excel is opt-in
+EXPORT_FORMATS = [f.strip() for f in os.getenv("EXPORT_FORMATS", "parquet").split(",") if f.strip()]
+
+# Rows per worksheet, header included
+EXCEL_MAX_ROWS = 1048576
+
+EXPORTERS = {}
+
+
+def register_exporter(name: str, fn) -> None:
+    """
+    Registers an export target. fn(frames, date_str, out_dir) writes every
+    layer frame and returns the path it wrote.
+    """
+    EXPORTERS[name] = fn
+
+
+def _non_empty(frames: dict):
+    for layer_name, df in frames.items():
+        if df is not None and not df.empty:
+            yield layer_name, df
+
+
+def arrow_table(df: pd.DataFrame) -> pa.Table:
+    """DataFrame -> Arrow table, without the index."""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns (ids as int and str, ...) go over as text
+        mixed = {col: df[col].astype(str) for col in df.columns if df[col].dtype == object}
+        return pa.Table.from_pandas(df.assign(**mixed), preserve_index=False)
+
+
+def export_parquet_dataset(frames: dict, date_str: str, out_dir: str = EXPORT_DIR) -> str:
+    """Hive-partitioned Parquet dataset, one partition per layer and date."""
+    root = os.path.join(out_dir, "dataset")
+    for layer_name, df in _non_empty(frames):
+        part_dir = os.path.join(root, f"layer={layer_name}", f"date={date_str}")
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, "part.parquet")
+        tmp_path = path + ".tmp"
+        pq.write_table(arrow_table(df), tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+    return root
+
+
+def export_arrow(frames: dict, date_str: str, out_dir: str = EXPORT_DIR) -> str:
+    """One Arrow IPC (Feather v2) file per layer, memory-mappable by readers."""
+    root = os.path.join(out_dir, "arrow")
+    os.makedirs(root, exist_ok=True)
+    for layer_name, df in _non_empty(frames):
+        path = os.path.join(root, f"{layer_name}_{date_str}.arrow")
+        tmp_path = path + ".tmp"
+        feather.write_feather(arrow_table(df), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+    return root
+
+
+def export_duckdb(frames: dict, date_str: str, out_dir: str = EXPORT_DIR) -> str:
+    """A single DuckDB file with one table per layer."""
+    try:
+        import duckdb
+    except ImportError as e:
+        raise RuntimeError("The duckdb exporter needs the duckdb package (pip install duckdb)") from e
+
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"layers_{date_str}.duckdb")
+    con = duckdb.connect(path)
+    try:
+        for layer_name, df in _non_empty(frames):
+            con.register("frame", arrow_table(df))
+            con.execute(f'CREATE OR REPLACE TABLE "{layer_name}" AS SELECT * FROM frame')
+            con.unregister("frame")
+    finally:
+        con.close()
+    return path
+
+
+def export_sqlite(frames: dict, date_str: str, out_dir: str = EXPORT_DIR) -> str:
+    """A single SQLite file with one table per layer."""
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"layers_{date_str}.sqlite")
+    con = sqlite3.connect(path)
+    try:
+        for layer_name, df in _non_empty(frames):
+            df.to_sql(layer_name, con, if_exists="replace", index=False, chunksize=10000)
+        con.commit()
+    finally:
+        con.close()
+    return path
+
+
+def export_excel(frames: dict, date_str: str, out_dir: str = EXPORT_DIR) -> str:
+    """
+    Workbook with a sheet per layer, streamed row by row through openpyxl's
+    write-only mode so memory stays flat however large a layer is.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError as e:
+        raise RuntimeError("The excel exporter needs the openpyxl package (pip install openpyxl)") from e
+
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"all_layers_{date_str}.xlsx")
+    wb = Workbook(write_only=True)
+    for layer_name, df in frames.items():
+        ws = wb.create_sheet(title=layer_name[:31])
+        if df is None or df.empty:
+            # create a one-row sheet if no data
+            ws.append(["Message"])
+            ws.append([f"No data for {layer_name}"])
+            continue
+        if len(df) >= EXCEL_MAX_ROWS:
+            print(f"⚠️ {layer_name} has {len(df)} rows; Excel keeps the first {EXCEL_MAX_ROWS - 1}")
+            df = df.head(EXCEL_MAX_ROWS - 1)
+        ws.append([str(col) for col in df.columns])
+        # Excel has no time zones
+        naive = {
+            col: df[col].dt.tz_localize(None) for col in df.columns
+            if isinstance(df[col].dtype, pd.DatetimeTZDtype)
+        }
+        df = df.assign(**naive)
+        for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+            ws.append(list(row))
+    wb.save(path)
+    return path
+
+
+register_exporter("parquet", export_parquet_dataset)
+register_exporter("arrow",   export_arrow)
+register_exporter("duckdb",  export_duckdb)
+register_exporter("sqlite",  export_sqlite)
+register_exporter("excel",   export_excel)
+
+
+def export_all(frames: dict, date_str: str, formats: list = None, out_dir: str = EXPORT_DIR) -> dict:
+    """Runs every requested exporter. Returns {format: path written}."""
+    written = {}
+    for fmt in formats or EXPORT_FORMATS:
+        if fmt not in EXPORTERS:
+            raise ValueError(f"Unknown export format '{fmt}' (have: {', '.join(EXPORTERS)})")
+        written[fmt] = EXPORTERS[fmt](frames, date_str, out_dir)
+    return written
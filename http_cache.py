@@ -0,0 +1,171 @@
+# http_cache.py
+
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import date
+
+# Persistent JSON response cache keyed by URL + params:
+#   http_cache/<key[:2]>/<key>.json
+CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "http_cache")
+
+# TTL classes in seconds; None never expires
+TTL_CLASSES = {
+    "immutable": None,        # closed seasons never change
+    "schedule":  3 * 3600,
+    "season":    6 * 3600,    # current-season stats
+    "boxscore":  60,
+    "live":      10,          # feed/live
+    "odds":      30,
+    "default":   15 * 60,
+}
+
+# Never written to disk alongside the cached body
+SECRET_PARAMS = {"apiKey"}
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "revalidated": 0, "stores": 0}
+
+
+def ttl_class(url: str, params: dict = None) -> str:
+    """Picks the TTL class for a request from its endpoint and season."""
+    params = params or {}
+    if "/feed/live" in url:
+        return "live"
+    if "the-odds-api.com" in url:
+        return "odds"
+    if "/schedule" in url:
+        return "schedule"
+    if "/boxscore" in url:
+        return "boxscore"
+    # Only a single past season is immutable; lists ("2024,2025") and blanks are not
+    season = str(params.get("season", "")).strip()
+    if season.isdigit() and int(season) < date.today().year:
+        return "immutable"
+    if "/stats" in url or "/teams" in url:
+        return "season"
+    return "default"
+
+
+def cache_key(url: str, params: dict = None) -> str:
+    payload = json.dumps([url, sorted((params or {}).items())], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json")
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def lookup(url: str, params: dict = None):
+    """Returns the cached entry for a request, fresh or stale, or None."""
+    path = _path(cache_key(url, params))
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(entry: dict, ttl: str = None) -> bool:
+    """
+    Whether an entry is still within its TTL. An override class can only
+    shorten the TTL the entry was stored with: a boxscore cached while the
+    game was live stays short-lived after the game goes final, until it is
+    fetched again.
+    """
+    stored = TTL_CLASSES.get(entry["ttl_class"], TTL_CLASSES["default"])
+    override = TTL_CLASSES.get(ttl, TTL_CLASSES["default"]) if ttl else stored
+    limits = [t for t in (stored, override) if t is not None]
+    return not limits or time.time() - entry["fetched_at"] < min(limits)
+
+
+def conditional_headers(entry: dict) -> dict:
+    """If-None-Match / If-Modified-Since headers for revalidating a stale entry."""
+    if entry is None:
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _write(key: str, entry: dict) -> None:
+    path = _path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+
+def store(url: str, params: dict, body, headers=None, ttl: str = None) -> None:
+    headers = headers or {}
+    entry = {
+        "url": url,
+        "params": {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS},
+        "ttl_class": ttl or ttl_class(url, params),
+        "fetched_at": time.time(),
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "body": body,
+    }
+    _write(cache_key(url, params), entry)
+    _count("stores")
+
+
+def touch(url: str, params: dict, entry: dict, ttl: str = None) -> None:
+    """Marks a stale entry fresh again after a 304 Not Modified."""
+    entry["fetched_at"] = time.time()
+    if ttl:
+        entry["ttl_class"] = ttl
+    _write(cache_key(url, params), entry)
+    _count("revalidated")
+
+
+def record_hit() -> None:
+    _count("hits")
+
+
+def record_miss() -> None:
+    _count("misses")
+
+
+def stats() -> dict:
+    with _lock:
+        counts = dict(_stats)
+    lookups = counts["hits"] + counts["misses"]
+    counts["hit_rate"] = round(counts["hits"] / lookups, 3) if lookups else None
+    return counts
+
+
+def clear(ttl_classes: list = None) -> int:
+    """Deletes cached entries (only the given TTL classes if provided). Returns count removed."""
+    removed = 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            if ttl_classes is not None:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        if json.load(f).get("ttl_class") not in ttl_classes:
+                            continue
+                except (OSError, ValueError):
+                    pass
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        print(f"🧹 Removed {clear(sys.argv[2:] or None)} cached response(s) from {CACHE_DIR}")
@@ -1,4 +1,4 @@
-import requests
+from statsapi import get_json
 import pandas as pd
 from datetime import datetime
 
@@ -24,9 +24,7 @@ def fetch_layer_twelve(game_date: str) -> pd.DataFrame:
         "oddsFormat": "decimal"
     }
 
-    resp = requests.get(ODDS_API_URL, params=params, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
+    data = get_json(ODDS_API_URL, params=params)
 
     records = []
     for game in data:
@@ -1,74 +1,20 @@
 # layer13_modified.py
 
 import pandas as pd
-from pybaseball import statcast, playerid_reverse_lookup
-from datetime import datetime, timedelta
+from pybaseball import playerid_reverse_lookup
+from statcast_engine import register_layer, build_layers
+from datetime import datetime
 
 
-def fetch_layer_thirteen() -> pd.DataFrame:
-    """
-    Bill James Sabermetrics Layer (Layer 13 Extended)
-    Pulls Statcast data for the last 30 days and calculates:
-    - Runs Created (RC)
-    - Secondary Average (SecA)
-    - RC per 27 Outs (RC27)
-    - Plus expanded Statcast metrics
-    """
-    end_date = datetime.today()
-    start_date = end_date - timedelta(days=30)
-    start_str = start_date.strftime('%Y-%m-%d')
-    end_str = end_date.strftime('%Y-%m-%d')
-
-    df = statcast(start_str, end_str)
-    if df.empty:
+def _finalize_layer_thirteen(summary: pd.DataFrame) -> pd.DataFrame:
+    if summary.empty:
         return pd.DataFrame()
+    summary = summary.rename(columns={'batter': 'Batter ID'})
 
-    df = df[df['events'].notna() & df['description'].notna()].copy()
-
-    # Original hit types
-    df['1B'] = (df['events'] == 'single').astype(int)
-    df['2B'] = (df['events'] == 'double').astype(int)
-    df['3B'] = (df['events'] == 'triple').astype(int)
-    df['HR'] = (df['events'] == 'home_run').astype(int)
-    df['BB'] = df['description'].str.contains('walk', na=False).astype(int)
-    df['H'] = df[['1B', '2B', '3B', 'HR']].sum(axis=1)
-    df['TB'] = df['1B'] + 2 * df['2B'] + 3 * df['3B'] + 4 * df['HR']
-
-    # Approximate AB by excluding non-AB events
-    non_ab_events = ['walk', 'hit_by_pitch', 'sac_fly', 'sac_bunt', 'intent_walk', 'catcher_interf']
-    df['AB'] = (~df['events'].isin(non_ab_events)).astype(int)
-
-    df['SB'] = (df['events'] == 'stolen_base').astype(int)
-    df['CS'] = (df['events'] == 'caught_stealing').astype(int)
-    df['K'] = df['events'].eq('strikeout').astype(int)
-
-    df['OUTS'] = df['AB'] - df['H']
-
-    # Clean statcast metrics
-    df['launch_speed'] = pd.to_numeric(df['launch_speed'], errors='coerce')
-    df['launch_angle'] = pd.to_numeric(df['launch_angle'], errors='coerce')
-    df['estimated_woba_using_speedangle'] = pd.to_numeric(df['estimated_woba_using_speedangle'], errors='coerce')
-    df['estimated_ba_using_speedangle'] = pd.to_numeric(df['estimated_ba_using_speedangle'], errors='coerce')
-
-    # Group by batter
-    summary = df.groupby('batter').agg({
-        'H': 'sum',
-        'BB': 'sum',
-        'TB': 'sum',
-        'AB': 'sum',
-        'OUTS': 'sum',
-        'SB': 'sum',
-        'CS': 'sum',
-        '1B': 'sum',
-        '2B': 'sum',
-        '3B': 'sum',
-        'HR': 'sum',
-        'K': 'sum',
-        'launch_speed': 'mean',
-        'launch_angle': 'mean',
-        'estimated_woba_using_speedangle': 'mean',
-        'estimated_ba_using_speedangle': 'mean'
-    }).rename_axis('Batter ID').reset_index()
+    # Totals derived from the per-event counts
+    summary['H'] = summary['1B'] + summary['2B'] + summary['3B'] + summary['HR']
+    summary['TB'] = summary['1B'] + 2 * summary['2B'] + 3 * summary['3B'] + 4 * summary['HR']
+    summary['OUTS'] = summary['AB'] - summary['H']
 
     # Rename new statcast columns
     summary.rename(columns={
@@ -101,6 +47,46 @@ def fetch_layer_thirteen() -> pd.DataFrame:
     return summary[cols]
 
 
+# Per-batter Bill James inputs over the last 30 days
+register_layer(
+    "layer13",
+    days=30,
+    group_keys=['batter'],
+    aggregations={
+        'BB': ('bb_desc', 'sum'),
+        'AB': ('is_ab', 'sum'),
+        'SB': ('is_sb', 'sum'),
+        'CS': ('is_cs', 'sum'),
+        '1B': ('is_single', 'sum'),
+        '2B': ('is_double', 'sum'),
+        '3B': ('is_triple', 'sum'),
+        'HR': ('is_hr', 'sum'),
+        'K': ('is_k', 'sum'),
+        'launch_speed': ('launch_speed', 'mean'),
+        'launch_angle': ('launch_angle', 'mean'),
+        'estimated_woba_using_speedangle': ('estimated_woba_using_speedangle', 'mean'),
+        'estimated_ba_using_speedangle': ('estimated_ba_using_speedangle', 'mean')
+    },
+    columns=['events', 'description'],
+    flags=['bb_desc', 'is_ab', 'is_sb', 'is_cs', 'is_single', 'is_double', 'is_triple', 'is_hr', 'is_k'],
+    rows=lambda d: d['events'].notna() & d['description'].notna(),
+    finalize=_finalize_layer_thirteen
+)
+
+
+def fetch_layer_thirteen() -> pd.DataFrame:
+    """
+    Bill James Sabermetrics Layer (Layer 13 Extended)
+    Pulls Statcast data for the last 30 days and calculates:
+    - Runs Created (RC)
+    - Secondary Average (SecA)
+    - RC per 27 Outs (RC27)
+    - Plus expanded Statcast metrics
+    """
+    end_str = datetime.today().strftime('%Y-%m-%d')
+    return build_layers(end_str, ["layer13"])["layer13"]
+
+
 if __name__ == "__main__":
     df = fetch_layer_thirteen()
     today = datetime.today().strftime('%Y-%m-%d')
@@ -0,0 +1,168 @@
+# layer_checkpoints.py
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import importlib.util
+from datetime import date, timedelta
+
+# Layer checkpoints, named by run date plus a content fingerprint:
+#   checkpoints/<layer>_<YYYY-MM-DD>_<fingerprint>.parquet
+#   checkpoints/manifest.json   (what went into each fingerprint)
+#   checkpoints/published.json  (last checkpoint published to the DB, per layer)
+CHECKPOINT_DIR = "checkpoints"
+MANIFEST_FILE = "manifest.json"
+PUBLISHED_FILE = "published.json"
+
+# Retention: anything dated more than KEEP_DAYS ago goes, then the oldest
+# files until the directory fits in MAX_BYTES
+KEEP_DAYS = int(os.getenv("CHECKPOINT_KEEP_DAYS", "14"))
+MAX_BYTES = int(float(os.getenv("CHECKPOINT_MAX_MB", "2048")) * 1024 * 1024)
+
+# Never collected, nor is any checkpoint published.json points at
+PROTECTED_FILES = {MANIFEST_FILE, PUBLISHED_FILE, "changes.jsonl"}
+
+_DATED = re.compile(r"^(?P<layer>.+?)_(?P<date>\d{4}-\d{2}-\d{2})(?:_[0-9a-f]+)?(?:\.delta)?\.parquet$")
+
+_lock = threading.Lock()
+_source_hashes = {}
+
+
+def source_hash(module_name: str) -> str:
+    """Hash of a module's source file, so editing a layer invalidates its checkpoints."""
+    if module_name not in _source_hashes:
+        spec = importlib.util.find_spec(module_name)
+        digest = hashlib.sha256()
+        if spec is not None and spec.origin and os.path.exists(spec.origin):
+            with open(spec.origin, "rb") as f:
+                digest.update(f.read())
+        _source_hashes[module_name] = digest.hexdigest()
+    return _source_hashes[module_name]
+
+
+def fingerprint(
+    layer_name: str,
+    params: dict = None,
+    window: tuple = None,
+    sources: list = None,
+    schema=None
+) -> tuple:
+    """
+    Content key for a layer checkpoint from its parameters, input window,
+    the source of the modules that build it and its declared columns.
+    Returns (16-char fingerprint, the inputs it was built from).
+    """
+    inputs = {
+        "layer":   layer_name,
+        "params":  params or {},
+        "window":  [str(d) for d in window] if window else None,
+        "sources": {name: source_hash(name) for name in sorted(sources or [])},
+        "schema":  schema,
+    }
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16], inputs
+
+
+def checkpoint_path(layer_name: str, date_str: str, fp: str, checkpoint_dir: str = CHECKPOINT_DIR) -> str:
+    return os.path.join(checkpoint_dir, f"{layer_name}_{date_str}_{fp}.parquet")
+
+
+def _manifest_path(checkpoint_dir: str) -> str:
+    return os.path.join(checkpoint_dir, MANIFEST_FILE)
+
+
+def load_manifest(checkpoint_dir: str = CHECKPOINT_DIR) -> dict:
+    try:
+        with open(_manifest_path(checkpoint_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest: dict, checkpoint_dir: str) -> None:
+    path = _manifest_path(checkpoint_dir)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def record(path: str, inputs: dict, rows: int) -> None:
+    """Adds a freshly written checkpoint to the manifest."""
+    checkpoint_dir = os.path.dirname(path)
+    with _lock:
+        manifest = load_manifest(checkpoint_dir)
+        manifest[os.path.basename(path)] = {
+            **inputs,
+            "rows": rows,
+            "bytes": os.path.getsize(path),
+            "created_at": time.time(),
+        }
+        _write_manifest(manifest, checkpoint_dir)
+
+
+def gc(keep_days: int = KEEP_DAYS, max_bytes: int = MAX_BYTES, checkpoint_dir: str = CHECKPOINT_DIR) -> list:
+    """
+    Applies the retention policy to checkpoint_dir: files dated before
+    today - keep_days are removed, then the least recently written ones
+    until the rest fit in max_bytes. The manifest is pruned to match.
+    Returns the names of the files removed.
+    """
+    if not os.path.isdir(checkpoint_dir):
+        return []
+    cutoff = (date.today() - timedelta(days=keep_days)).isoformat()
+    published = set()
+    try:
+        with open(os.path.join(checkpoint_dir, PUBLISHED_FILE), "r", encoding="utf-8") as f:
+            published = {entry["checkpoint"] for entry in json.load(f).values()}
+    except (OSError, ValueError):
+        pass
+
+    files = []
+    for name in os.listdir(checkpoint_dir):
+        path = os.path.join(checkpoint_dir, name)
+        if name in PROTECTED_FILES or name in published or not os.path.isfile(path):
+            continue
+        m = _DATED.match(name)
+        if m is None:
+            continue
+        st = os.stat(path)
+        files.append((m.group("date"), st.st_mtime, st.st_size, name))
+
+    removed = [name for day, _, _, name in files if day < cutoff]
+    kept = sorted((f for f in files if f[3] not in removed), key=lambda f: (f[0], f[1]))
+    total = sum(size for _, _, size, _ in kept)
+    for _, _, size, name in kept:
+        if total <= max_bytes:
+            break
+        removed.append(name)
+        total -= size
+
+    with _lock:
+        for name in removed:
+            try:
+                os.remove(os.path.join(checkpoint_dir, name))
+            except OSError:
+                pass
+        manifest = load_manifest(checkpoint_dir)
+        pruned = {
+            name: entry for name, entry in manifest.items()
+            if os.path.exists(os.path.join(checkpoint_dir, name))
+        }
+        if pruned != manifest:
+            _write_manifest(pruned, checkpoint_dir)
+    return removed
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "gc":
+        keep = int(sys.argv[2]) if len(sys.argv) > 2 else KEEP_DAYS
+        max_mb = float(sys.argv[3]) if len(sys.argv) > 3 else MAX_BYTES / (1024 * 1024)
+        removed = gc(keep, int(max_mb * 1024 * 1024))
+        print(f"🧹 Removed {len(removed)} checkpoint file(s) from {CHECKPOINT_DIR}")
+    else:
+        print("usage: python layer_checkpoints.py gc [keep_days] [max_mb]")
@@ -0,0 +1,111 @@
+# layer_scheduler.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+def add_task(tasks: dict, name: str, fn=None, deps: list = None) -> None:
+    """
+    Declares a node in the DAG. fn takes no arguments (None for a pure
+    marker node); deps are the names of nodes that must finish first.
+    """
+    tasks[name] = {"fn": fn, "deps": list(deps or [])}
+
+
+def _check(tasks: dict) -> None:
+    for name, task in tasks.items():
+        for dep in task["deps"]:
+            if dep not in tasks:
+                raise ValueError(f"Task '{name}' depends on unknown task '{dep}'")
+
+    # Kahn's algorithm: anything left over sits on a cycle
+    remaining = {name: len(task["deps"]) for name, task in tasks.items()}
+    ready = [name for name, n in remaining.items() if n == 0]
+    seen = 0
+    while ready:
+        node = ready.pop()
+        seen += 1
+        for name, task in tasks.items():
+            if node in task["deps"]:
+                remaining[name] -= 1
+                if remaining[name] == 0:
+                    ready.append(name)
+    if seen != len(tasks):
+        raise ValueError("Task graph has a cycle")
+
+
+def critical_path(tasks: dict, timings: dict) -> tuple:
+    """
+    Longest chain of dependent tasks by wall time.
+    Returns (list of task names, total seconds).
+    """
+    memo = {}
+
+    def longest(name):
+        if name not in memo:
+            best = max((longest(dep) for dep in tasks[name]["deps"] if dep in tasks), default=(0.0, []), key=lambda r: r[0])
+            memo[name] = (best[0] + timings.get(name, 0.0), best[1] + [name])
+        return memo[name]
+
+    total, path = max((longest(name) for name in tasks), default=(0.0, []), key=lambda r: r[0])
+    return path, total
+
+
+def run_tasks(tasks: dict, max_workers: int = 4) -> tuple:
+    """
+    Runs every task as soon as its dependencies have finished, with at most
+    max_workers running at once. A failed task is reported and its
+    dependents are skipped; independent branches keep going.
+    Tasks run on threads: they are mostly I/O bound, and the closures
+    build_tasks declares could not be pickled for a process pool anyway.
+    Returns (results, timings, errors) keyed by task name.
+    """
+    _check(tasks)
+
+    results, timings, errors = {}, {}, {}
+    pending = dict(tasks)
+    running = {}
+
+    def submit_ready(executor):
+        for name in list(pending):
+            deps = pending[name]["deps"]
+            if any(dep in errors for dep in deps):
+                errors[name] = RuntimeError(f"skipped: dependency failed ({', '.join(d for d in deps if d in errors)})")
+                del pending[name]
+                print(f"⏭ Skipping {name}: {errors[name]}")
+                continue
+            if all(dep in results for dep in deps):
+                fn = pending.pop(name)["fn"]
+                if fn is None:
+                    results[name], timings[name] = None, 0.0
+                    continue
+                running[executor.submit(fn)] = (name, time.perf_counter())
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        submit_ready(executor)
+        while running or pending:
+            # Marker nodes finish instantly and can unlock more work
+            if not running:
+                before = len(pending)
+                submit_ready(executor)
+                if len(pending) == before and not running:
+                    break
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name, t0 = running.pop(future)
+                timings[name] = time.perf_counter() - t0
+                try:
+                    results[name] = future.result()
+                    print(f"✅ {name} finished in {timings[name]:.1f}s")
+                except Exception as e:
+                    errors[name] = e
+                    print(f"❌ {name} failed after {timings[name]:.1f}s: {e}")
+            submit_ready(executor)
+
+    wall = time.perf_counter() - started
+    path, path_time = critical_path({n: tasks[n] for n in timings}, timings)
+    print(f"⏱️ Wall time {wall:.1f}s vs {sum(timings.values()):.1f}s of task time")
+    print(f"🧭 Critical path ({path_time:.1f}s): {' → '.join(path)}")
+    return results, timings, errors
@@ -2,50 +2,10 @@
 
 import pandas as pd
 import numpy as np
-from pybaseball import statcast, playerid_reverse_lookup
-from datetime import datetime, timedelta
-
-def fetch_layer_eleven(game_date: str) -> pd.DataFrame:
-    """
-    Fetches pitcher-batter matchups over the past 365 days leading up to game_date,
-    aggregates outcomes, calculates metrics, and attaches player names.
-    :param game_date: "YYYY-MM-DD"; determines end date for the 365-day window.
-    :return: DataFrame with columns:
-      ['BatterName','PitcherName','batter','pitcher','PA','Hits','HR','BB','K',
-       'AVG','OBP','SLG','OPS','ISO','K%','BB%']
-    """
-    # 1) Determine date range
-    end_dt = datetime.strptime(game_date, "%Y-%m-%d")
-    start_dt = end_dt - timedelta(days=365)
-
-    # 2) Pull raw Statcast data
-    raw = statcast(
-        start_dt=start_dt.strftime("%Y-%m-%d"),
-        end_dt=end_dt.strftime("%Y-%m-%d")
-    )
-    if raw.empty:
-        return pd.DataFrame()
-
-    # 3) Filter and flag outcomes
-    df = raw.dropna(subset=["batter", "pitcher", "description"]).copy()
-    df["is_hit"] = df["events"].isin(["single", "double", "triple", "home_run"])
-    df["is_hr"]  = df["events"] == "home_run"
-    df["is_bb"]  = df["description"].str.contains("walk", na=False)
-    df["is_k"]   = df["description"].str.contains("strikeout", na=False)
-
-    # 4) Aggregate per batter-pitcher pair
-    summary = (
-        df.groupby(["batter", "pitcher"])
-          .agg(
-            PA=("pitch_type", "count"),
-            Hits=("is_hit", "sum"),
-            HR=("is_hr", "sum"),
-            BB=("is_bb", "sum"),
-            K=("is_k", "sum")
-          )
-          .reset_index()
-    )
+from pybaseball import playerid_reverse_lookup
+from statcast_engine import register_layer, build_layers
 
+def _finalize_layer_eleven(summary: pd.DataFrame) -> pd.DataFrame:
     if summary.empty:
         return pd.DataFrame()
 
@@ -90,3 +50,32 @@ def fetch_layer_eleven(game_date: str) -> pd.DataFrame:
         summary[["AVG", "OBP", "SLG", "OPS", "ISO", "K%", "BB%"]].round(3)
 
     return summary
+
+# Pitcher-batter matchup outcomes over the last 365 days
+register_layer(
+    "layereleven",
+    days=365,
+    group_keys=["batter", "pitcher"],
+    aggregations={
+        "PA":   ("pitch_type", "count"),
+        "Hits": ("is_hit", "sum"),
+        "HR":   ("is_hr", "sum"),
+        "BB":   ("bb_desc", "sum"),
+        "K":    ("k_desc", "sum")
+    },
+    columns=["description"],
+    flags=["is_hit", "is_hr", "bb_desc", "k_desc"],
+    rows=lambda d: d["batter"].notna() & d["pitcher"].notna() & d["description"].notna(),
+    finalize=_finalize_layer_eleven
+)
+
+def fetch_layer_eleven(game_date: str) -> pd.DataFrame:
+    """
+    Fetches pitcher-batter matchups over the past 365 days leading up to game_date,
+    aggregates outcomes, calculates metrics, and attaches player names.
+    :param game_date: "YYYY-MM-DD"; determines end date for the 365-day window.
+    :return: DataFrame with columns:
+      ['BatterName','PitcherName','batter','pitcher','PA','Hits','HR','BB','K',
+       'AVG','OBP','SLG','OPS','ISO','K%','BB%']
+    """
+    return build_layers(game_date, ["layereleven"])["layereleven"]
@@ -1,21 +1,20 @@
 import pandas as pd
-import requests
+from statsapi import get_many
 from datetime import date
 
 def fetch_layer_five(game_date: str) -> pd.DataFrame:
     seasons = [2021, 2022, 2023, 2024, 2025]
     all_rows = []
 
-    for season in seasons:
-        url = (
-            "https://statsapi.mlb.com/api/v1/stats"
-            "?stats=season&group=hitting&gameType=R&limit=1000"
-            f"&season={season}"
-        )
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        data = resp.json()
+    responses = get_many([
+        ("/api/v1/stats", {
+            "stats": "season", "group": "hitting", "gameType": "R",
+            "limit": 1000, "season": season
+        })
+        for season in seasons
+    ], return_exceptions=False)
 
+    for season, data in zip(seasons, responses):
         splits = data.get("stats", [{}])[0].get("splits", [])
         for split in splits:
             s = split["stat"]
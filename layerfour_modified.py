@@ -1,72 +1,47 @@
 import pandas as pd
-from pybaseball import statcast
-from datetime import datetime, timedelta
+from statcast_engine import register_layer, build_layers
+from datetime import datetime
 
-def fetch_layer_four(game_date: str) -> pd.DataFrame:
-    end_dt = datetime.today()
-    start_dt = end_dt - timedelta(days=365)  # faster pull
-    start_str = start_dt.strftime('%Y-%m-%d')
-    end_str = end_dt.strftime('%Y-%m-%d')
-
-    print(f"⭭️ Pulling Statcast data from {start_str} to {end_str}…")
-
-    raw = statcast(start_dt=start_str, end_dt=end_str)
-    print(f"✅ Pulled {len(raw)} rows")
-
-    raw['launch_speed'] = pd.to_numeric(raw['launch_speed'], errors='coerce')
-    raw['launch_angle'] = pd.to_numeric(raw['launch_angle'], errors='coerce')
-    raw['hit_distance_sc'] = pd.to_numeric(raw['hit_distance_sc'], errors='coerce')
-    raw['Pitcher Name'] = raw['player_name']
-
-    raw['barrel'] = (
-        (raw['launch_speed'] >= 98) &
-        raw['launch_angle'].between(26, 30)
-    ).fillna(False).astype(int)
-    raw['hard_hit'] = (raw['launch_speed'] >= 95).fillna(False).astype(int)
-
-    # Safe list of fields to aggregate
-    candidate_fields = {
-        'release_speed': 'mean',
-        'release_spin_rate': 'mean',
-        'release_extension': 'mean',
-        'release_pos_x': 'mean',
-        'release_pos_z': 'mean',
-        'pfx_x': 'mean',
-        'pfx_z': 'mean',
-        'break_length': 'mean',
-        'break_angle': 'mean',
-        'spin_axis': 'mean',
-        'plate_x': 'mean',
-        'plate_z': 'mean',
-        'vx0': 'mean',
-        'vy0': 'mean',
-        'vz0': 'mean',
-        'ax': 'mean',
-        'ay': 'mean',
-        'az': 'mean',
-        'hit_distance_sc': 'mean',
-        'launch_speed': 'mean',
-        'launch_angle': 'mean',
-        'estimated_woba_using_speedangle': 'mean',
-        'estimated_ba_using_speedangle': 'mean',
-        'zone': 'mean',
-        'outs_when_up': 'mean',
-        'inning': 'mean',
-        'barrel': 'sum',
-        'hard_hit': 'sum',
-        'events': 'count'
-    }
-
-    # Only use fields that are actually present
-    agg_fields = {k: v for k, v in candidate_fields.items() if k in raw.columns}
-
-    stats = raw.groupby(['pitcher', 'Pitcher Name'], as_index=False).agg(agg_fields)
+# Safe list of fields to aggregate
+candidate_fields = {
+    'release_speed': 'mean',
+    'release_spin_rate': 'mean',
+    'release_extension': 'mean',
+    'release_pos_x': 'mean',
+    'release_pos_z': 'mean',
+    'pfx_x': 'mean',
+    'pfx_z': 'mean',
+    'break_length': 'mean',
+    'break_angle': 'mean',
+    'spin_axis': 'mean',
+    'plate_x': 'mean',
+    'plate_z': 'mean',
+    'vx0': 'mean',
+    'vy0': 'mean',
+    'vz0': 'mean',
+    'ax': 'mean',
+    'ay': 'mean',
+    'az': 'mean',
+    'hit_distance_sc': 'mean',
+    'launch_speed': 'mean',
+    'launch_angle': 'mean',
+    'estimated_woba_using_speedangle': 'mean',
+    'estimated_ba_using_speedangle': 'mean',
+    'zone': 'mean',
+    'outs_when_up': 'mean',
+    'inning': 'mean',
+    'barrel': 'sum',
+    'hard_hit': 'sum',
+    'events': 'count'
+}
 
+def _finalize_layer_four(stats: pd.DataFrame) -> pd.DataFrame:
     stats['HardHit%'] = (stats['hard_hit'] / stats['events']) * 100
     stats['Barrel%'] = (stats['barrel'] / stats['events']) * 100
 
     stats.rename(columns={
         'pitcher': 'Pitcher ID',
+        'player_name': 'Pitcher Name',
         'release_speed': 'Avg Velo',
         'release_spin_rate': 'Avg Spin Rate',
         'release_extension': 'Avg Extension',
@@ -106,6 +81,20 @@ def fetch_layer_four(game_date: str) -> pd.DataFrame:
 
     return stats[final_cols]
 
+# Per-pitcher aggregates over the last 365 days
+register_layer(
+    "layerfour",
+    days=365,
+    group_keys=['pitcher', 'player_name'],
+    aggregations={field: (field, how) for field, how in candidate_fields.items()},
+    flags=['barrel', 'hard_hit'],
+    finalize=_finalize_layer_four
+)
+
+def fetch_layer_four(game_date: str) -> pd.DataFrame:
+    end_str = datetime.today().strftime('%Y-%m-%d')
+    return build_layers(end_str, ["layerfour"])["layerfour"]
+
 if __name__ == "__main__":
     today = datetime.today().date().isoformat()
     df = fetch_layer_four(today)
@@ -1,5 +1,6 @@
 import pandas as pd
-import requests
+from statsapi import get_many
+from schedule_snapshot import refresh_schedule
 import gspread
 import smtplib
 from email.mime.text import MIMEText
@@ -50,57 +51,63 @@ def detect_big_inning(row):
 # --- MAIN LOOP FUNCTION ---
 def run_layernine_sync():
     today = datetime.now().strftime('%Y-%m-%d')
-    schedule_url = f"https://statsapi.mlb.com/api/v1/schedule?sportId=1&date={today}"
     games = []
 
     try:
-        schedule_data = requests.get(schedule_url).json()
-        for date in schedule_data["dates"]:
-            for game in date["games"]:
-                gamePk = game["gamePk"]
-                away = game["teams"]["away"]["team"]["name"]
-                home = game["teams"]["home"]["team"]["name"]
-                status = game["status"]["detailedState"]
-
-                # Only include active or completed games
-                if status not in ["Final", "Game Over", "Postponed"]:
-                    try:
-                        live_url = f"https://statsapi.mlb.com/api/v1.1/game/{gamePk}/feed/live"
-                        live_data = requests.get(live_url).json()
-                        plays = live_data.get("liveData", {}).get("plays", {})
-                        linescore = live_data.get("liveData", {}).get("linescore", {})
-
-                        inning = linescore.get("currentInning", "—")
-                        half = linescore.get("inningHalf", "—")
-                        current_play = plays.get("currentPlay", {})
-                        outs = current_play.get("count", {}).get("outs", "—")
-                        runners = len(current_play.get("runners", []))
-
-                        away_team = linescore.get("teams", {}).get("away", {})
-                        home_team = linescore.get("teams", {}).get("home", {})
-
-                        games.append({
-                            "Away": away,
-                            "Home": home,
-                            "Status": status,
-                            "Inning": f"{half} {inning}",
-                            "Outs": outs,
-                            "Runners On": runners,
-                            "Away Score": away_team.get("runs", "—"),
-                            "Home Score": home_team.get("runs", "—"),
-                            "Away Hits": away_team.get("hits", "—"),
-                            "Home Hits": home_team.get("hits", "—"),
-                            "Away Errors": away_team.get("errors", "—"),
-                            "Home Errors": home_team.get("errors", "—")
-                        })
-                    except Exception:
-                        games.append({
-                            "Away": away, "Home": home, "Status": status,
-                            "Inning": "N/A", "Outs": "N/A", "Runners On": "N/A",
-                            "Away Score": "N/A", "Home Score": "N/A",
-                            "Away Hits": "N/A", "Home Hits": "N/A",
-                            "Away Errors": "N/A", "Home Errors": "N/A"
-                        })
+        # Re-pulled only while some game can still change status
+        schedule = refresh_schedule(today)
+        # Only include active or completed games
+        pending = list(
+            schedule[~schedule["status"].isin(["Final", "Game Over", "Postponed"])]
+            .itertuples(index=False)
+        )
+        # Live feeds for every pending game, fetched concurrently
+        feeds = get_many([
+            (f"/api/v1.1/game/{game.gamePk}/feed/live", None) for game in pending
+        ])
+
+        for game, live_data in zip(pending, feeds):
+            away = game.away_team
+            home = game.home_team
+            status = game.status
+
+            try:
+                if isinstance(live_data, Exception):
+                    raise live_data
+                plays = live_data.get("liveData", {}).get("plays", {})
+                linescore = live_data.get("liveData", {}).get("linescore", {})
+
+                inning = linescore.get("currentInning", "—")
+                half = linescore.get("inningHalf", "—")
+                current_play = plays.get("currentPlay", {})
+                outs = current_play.get("count", {}).get("outs", "—")
+                runners = len(current_play.get("runners", []))
+
+                away_team = linescore.get("teams", {}).get("away", {})
+                home_team = linescore.get("teams", {}).get("home", {})
+
+                games.append({
+                    "Away": away,
+                    "Home": home,
+                    "Status": status,
+                    "Inning": f"{half} {inning}",
+                    "Outs": outs,
+                    "Runners On": runners,
+                    "Away Score": away_team.get("runs", "—"),
+                    "Home Score": home_team.get("runs", "—"),
+                    "Away Hits": away_team.get("hits", "—"),
+                    "Home Hits": home_team.get("hits", "—"),
+                    "Away Errors": away_team.get("errors", "—"),
+                    "Home Errors": home_team.get("errors", "—")
+                })
+            except Exception:
+                games.append({
+                    "Away": away, "Home": home, "Status": status,
+                    "Inning": "N/A", "Outs": "N/A", "Runners On": "N/A",
+                    "Away Score": "N/A", "Home Score": "N/A",
+                    "Away Hits": "N/A", "Home Hits": "N/A",
+                    "Away Errors": "N/A", "Home Errors": "N/A"
+                })
 
     except Exception as e:
         print(f"❌ Failed to fetch schedule: {e}")
@@ -1,57 +1,89 @@
 import pandas as pd
-import requests
+from schedule_snapshot import get_schedule
 from pybaseball import statcast_pitcher
+from statcast_store import read_window, missing_days, SETTLE_DAYS
 from datetime import date, timedelta
 
-def fetch_layer_one(game_date: str) -> pd.DataFrame:
-    schedule_url = (
-        f"https://statsapi.mlb.com/api/v1/schedule"
-        f"?sportId=1&date={game_date}&hydrate=probablePitcher(note)"
+# Pitch-level fields the pitcher aggregates are built from
+PITCH_COLUMNS = [
+    'events', 'release_speed', 'release_spin_rate', 'launch_speed',
+    'estimated_woba_using_speedangle', 'estimated_ba_using_speedangle',
+    'pfx_z', 'pfx_x', 'release_extension', 'release_pos_x', 'release_pos_z'
+]
+
+def _bulk_pitches(start_date: str, end_date: str, pitcher_ids: set):
+    """
+    Pitches thrown by the given pitchers in [start_date, end_date] from the
+    local Statcast store, without downloading anything. Returns None when the
+    store has settled days missing from the window, since its aggregates
+    would then be incomplete.
+    """
+    settled = date.today() - timedelta(days=SETTLE_DAYS)
+    gaps = [d for d in missing_days(start_date, end_date) if d <= settled]
+    if gaps:
+        print(f"⚠️ Statcast store is missing {len(gaps)} day(s) of the window; pulling per pitcher")
+        return None
+
+    raw = read_window(start_date, end_date, columns=['pitcher'] + PITCH_COLUMNS, fetch_missing=False)
+    if raw.empty or 'pitcher' not in raw.columns:
+        return None
+    raw = raw[raw['pitcher'].isin(pitcher_ids)]
+
+    out = (
+        raw.reindex(columns=['pitcher'] + PITCH_COLUMNS)
+           .rename(columns={'pitcher': 'pitcher_id'})
+           .reset_index(drop=True)
     )
-    res = requests.get(schedule_url)
-    res.raise_for_status()
-    schedule_data = res.json()
-
-    games = []
-    pitcher_ids = set()
-
-    for day in schedule_data.get('dates', []):
-        for game in day.get('games', []):
-            home = game['teams']['home']
-            away = game['teams']['away']
-
-            rec = {
-                'Game Time (UTC)': game['gameDate'],
-                'Away Team': away['team']['name'],
-                'Home Team': home['team']['name'],
-            }
+    out['pitcher_id'] = out['pitcher_id'].astype('int64')
+    out['events'] = out['events'].astype(object)
+    # The store keeps float32; aggregate in float64 like the Savant path
+    numeric = [col for col in PITCH_COLUMNS if col != 'events']
+    out[numeric] = out[numeric].apply(pd.to_numeric, errors='coerce').astype('float64')
+    return out
 
-            for side, prefix in [(away, 'Away'), (home, 'Home')]:
-                pp = side.get('probablePitcher', {})
-                pid = pp.get('id')
-                name = pp.get('fullName', 'TBD')
-                rec[f'{prefix} Pitcher'] = name
-                rec[f'{prefix} Pitcher ID'] = pid
-                if pid is not None:
-                    pitcher_ids.add(pid)
 
-            games.append(rec)
+def fetch_layer_one(game_date: str) -> pd.DataFrame:
+    schedule = get_schedule(game_date)
 
-    games_df = pd.DataFrame(games).dropna(
-        subset=['Away Pitcher ID', 'Home Pitcher ID']
+    games_df = (
+        schedule[[
+            'gameDate', 'away_team', 'home_team',
+            'away_pitcher', 'away_pitcher_id', 'home_pitcher', 'home_pitcher_id'
+        ]]
+        .rename(columns={
+            'gameDate': 'Game Time (UTC)',
+            'away_team': 'Away Team',
+            'home_team': 'Home Team',
+            'away_pitcher': 'Away Pitcher',
+            'away_pitcher_id': 'Away Pitcher ID',
+            'home_pitcher': 'Home Pitcher',
+            'home_pitcher_id': 'Home Pitcher ID'
+        })
+        .dropna(subset=['Away Pitcher ID', 'Home Pitcher ID'])
+        .astype({'Away Pitcher ID': 'int64', 'Home Pitcher ID': 'int64'})
     )
+    pitcher_ids = set(games_df['Away Pitcher ID']) | set(games_df['Home Pitcher ID'])
 
-    # Step 2: Pull Statcast for each pitcher for last 365 days
+    # Step 2: Statcast for every probable pitcher over the last 365 days,
+    # from the local store in one pass, with Savant only for pitchers it lacks
     start_date = (pd.to_datetime(game_date) - timedelta(days=365)).strftime('%Y-%m-%d')
     statcast_dfs = []
 
-    for pid in pitcher_ids:
+    bulk = _bulk_pitches(start_date, game_date, pitcher_ids)
+    if bulk is not None and not bulk.empty:
+        statcast_dfs.append(bulk)
+        fallback_ids = pitcher_ids - set(bulk['pitcher_id'])
+        print(f"📦 {len(pitcher_ids) - len(fallback_ids)} pitcher(s) from the local Statcast store")
+    else:
+        fallback_ids = pitcher_ids
+
+    for pid in fallback_ids:
         print(f"📦 Pulling Statcast for pitcher ID: {pid}...")
         try:
             df = statcast_pitcher(start_date, game_date, pid)
             if not df.empty:
                 df['pitcher_id'] = pid
-                statcast_dfs.append(df)
+                statcast_dfs.append(df.reindex(columns=['pitcher_id'] + PITCH_COLUMNS))
         except Exception as e:
             print(f"❌ Failed for pitcher {pid}: {e}")
             continue
@@ -1,76 +1,80 @@
 # layersix_modified.py
 
 import pandas as pd
-import requests
-import os
+from statsapi import get_json
+from schedule_snapshot import get_schedule
+import overlay_cache
 from pybaseball import statcast_batter, statcast_pitcher
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pandas.errors import ParserError
 
+# Boxscores of finished games never change; live ones are re-pulled quickly
+BOXSCORE_TTL = {"Final": "immutable", "Live": "live", "Preview": "boxscore"}
+BOXSCORE_WORKERS = 8
+STATCAST_WORKERS = 4
+
+def fetch_boxscore(game) -> dict:
+    """
+    Boxscore for one schedule row, cached per gamePk with a TTL that
+    follows the game's status.
+    """
+    state = None if pd.isna(game.abstractState) else game.abstractState
+    return get_json(
+        f"/api/v1/game/{game.gamePk}/boxscore",
+        ttl=BOXSCORE_TTL.get(state, "boxscore")
+    )
+
+def _game_hitters(game, box) -> list:
+    hitters = []
+    for side, pid, team in [
+        ('home', game.away_pitcher_id, game.away_team),
+        ('away', game.home_pitcher_id, game.home_team)
+    ]:
+        if pd.isna(pid):
+            continue
+        pid = int(pid)
+        for p in box['teams'][side]['players'].values():
+            if 'batting' in p.get('stats', {}):
+                hitters.append({
+                    'Game Time':          game.gameDate,
+                    'Team':               team,
+                    'Batter':             p['person']['fullName'],
+                    'Batter ID':          p['person']['id'],
+                    'Opposing Pitcher ID': pid
+                })
+    return hitters
+
 def fetch_layer_six(date_str: str) -> pd.DataFrame:
     today = date_str
     start_dt = (datetime.strptime(date_str, "%Y-%m-%d") - timedelta(days=365)).strftime("%Y-%m-%d")
 
     # 1) Pull today's schedule and probable pitchers
-    sched = requests.get(
-        f"https://statsapi.mlb.com/api/v1/schedule?"
-        f"sportId=1&date={today}&hydrate=probablePitcher"
-    ).json()
-
-    hitters = []
-    for date_block in sched.get('dates', []):
-        for game in date_block.get('games', []):
-            game_time = game['gameDate']
-            home = game['teams']['home']
-            away = game['teams']['away']
-            home_pid = home.get('probablePitcher', {}).get('id')
-            away_pid = away.get('probablePitcher', {}).get('id')
-
-            box = requests.get(
-                f"https://statsapi.mlb.com/api/v1/game/{game['gamePk']}/boxscore"
-            ).json()
-
-            for side, pid, team in [
-                ('home', away_pid, away['team']['name']),
-                ('away', home_pid, home['team']['name'])
-            ]:
-                if not pid:
-                    continue
-                for p in box['teams'][side]['players'].values():
-                    if 'batting' in p.get('stats', {}):
-                        hitters.append({
-                            'Game Time':          game_time,
-                            'Team':               team,
-                            'Batter':             p['person']['fullName'],
-                            'Batter ID':          p['person']['id'],
-                            'Opposing Pitcher ID': pid
-                        })
-
-    df_hitters = pd.DataFrame(hitters).dropna(subset=['Batter ID', 'Opposing Pitcher ID'])
-    if df_hitters.empty:
-        return pd.DataFrame()
+    games = list(get_schedule(today).itertuples(index=False))
+    pitcher_ids = {
+        int(pid)
+        for game in games
+        for pid in (game.away_pitcher_id, game.home_pitcher_id)
+        if not pd.isna(pid)
+    }
 
     # 2) Build each pitcher's top-3 pitch mix
-    pitcher_map = {}
-    for pid in df_hitters['Opposing Pitcher ID'].unique():
+    def pitch_mix(pid):
         try:
-            pdf = statcast_pitcher(start_dt, today, int(pid))
+            pdf = statcast_pitcher(start_dt, today, pid)
             mix = pdf['pitch_type'].value_counts(normalize=True)
-            pitcher_map[pid] = mix[mix > 0.05].nlargest(3).index.tolist()
+            return mix[mix > 0.05].nlargest(3).index.tolist()
         except Exception:
-            pitcher_map[pid] = []
+            return []
 
-    os.makedirs("overlay_cache", exist_ok=True)
+    # Carry over yesterday's overlays for batters the window roll did not touch
+    overlay_cache.roll_forward(today, days=365)
 
     # 3) Overlay: Batter vs Pitch Type performance table
     def overlay_batter(bid):
-        cache_path = f"overlay_cache/batter_{bid}.csv"
-        if os.path.exists(cache_path):
-            try:
-                return pd.read_csv(cache_path)
-            except Exception:
-                pass  # fallback to re-pull if read fails
+        cached = overlay_cache.load(bid, today)
+        if cached is not None:
+            return cached
 
         try:
             bdf = statcast_batter(start_dt, today, int(bid))
@@ -137,18 +141,46 @@ def fetch_layer_six(date_str: str) -> pd.DataFrame:
             g['HardHit%'] = g['HardHits'] / g['PA']
 
             g['Batter ID'] = bid
-            g.to_csv(cache_path, index=False)
+            overlay_cache.save(bid, today, g)
             return g
         except ParserError:
             return pd.DataFrame()
 
+    # Boxscores, pitch mixes and batter overlays run concurrently: each game's
+    # batters are queued as soon as its boxscore lands
+    hitters = []
     records = []
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = {executor.submit(overlay_batter, bid): bid for bid in df_hitters['Batter ID'].unique()}
-        for future in as_completed(futures):
+    overlay_futures = {}
+    queued = set()
+    with ThreadPoolExecutor(max_workers=BOXSCORE_WORKERS) as box_pool, \
+         ThreadPoolExecutor(max_workers=STATCAST_WORKERS) as statcast_pool:
+        mix_futures = {statcast_pool.submit(pitch_mix, pid): pid for pid in pitcher_ids}
+        box_futures = {box_pool.submit(fetch_boxscore, game): game for game in games}
+
+        for future in as_completed(box_futures):
+            game = box_futures[future]
+            try:
+                box = future.result()
+            except Exception as e:
+                print(f"❌ Boxscore failed for game {game.gamePk}: {e}")
+                continue
+            game_hitters = _game_hitters(game, box)
+            hitters.extend(game_hitters)
+            for bid in dict.fromkeys(h['Batter ID'] for h in game_hitters):
+                if bid not in queued:
+                    queued.add(bid)
+                    overlay_futures[statcast_pool.submit(overlay_batter, bid)] = bid
+
+        pitcher_map = {pid: future.result() for future, pid in mix_futures.items()}
+        for future in as_completed(overlay_futures):
             result = future.result()
             if not result.empty:
                 records.append(result)
+    overlay_cache.evict()
+
+    df_hitters = pd.DataFrame(hitters).dropna(subset=['Batter ID', 'Opposing Pitcher ID'])
+    if df_hitters.empty:
+        return pd.DataFrame()
 
     if not records:
         return pd.DataFrame()
@@ -0,0 +1,161 @@
+# overlay_cache.py
+
+import os
+import shutil
+import threading
+import pandas as pd
+from datetime import timedelta
+from statcast_store import read_window, is_stored, SETTLE_DAYS
+
+# Per-batter pitch-type aggregates for layer six, one Parquet file per
+# (schema version, window end, batter):
+#   overlay_cache/v<SCHEMA_VERSION>/<window_end>/batter_<id>.parquet
+CACHE_DIR = os.getenv("OVERLAY_CACHE_DIR", "overlay_cache")
+
+# Bump whenever the overlay columns or their definitions change
+SCHEMA_VERSION = 1
+
+# Least recently used entries are evicted once the cache grows past this
+MAX_BYTES = int(float(os.getenv("OVERLAY_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+_lock = threading.Lock()
+
+
+def _version_dir() -> str:
+    return os.path.join(CACHE_DIR, f"v{SCHEMA_VERSION}")
+
+
+def _end_dir(window_end) -> str:
+    return os.path.join(_version_dir(), pd.to_datetime(window_end).date().isoformat())
+
+
+def _path(batter_id, window_end) -> str:
+    return os.path.join(_end_dir(window_end), f"batter_{int(batter_id)}.parquet")
+
+
+def load(batter_id, window_end):
+    """Cached aggregates for a batter and window end, or None on a miss."""
+    path = _path(batter_id, window_end)
+    try:
+        df = pd.read_parquet(path)
+    except (OSError, ValueError):
+        return None
+    # Reads count as use for LRU eviction
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return df
+
+
+def save(batter_id, window_end, df: pd.DataFrame) -> None:
+    path = _path(batter_id, window_end)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _entries() -> list:
+    entries = []
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if name.endswith(".parquet"):
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+    return entries
+
+
+def evict(max_bytes: int = MAX_BYTES) -> int:
+    """
+    Drops other schema versions (and the legacy per-batter CSVs) outright,
+    then least recently used entries
+    until the cache fits in max_bytes. Returns the number of files removed.
+    """
+    removed = 0
+    with _lock:
+        if os.path.isdir(CACHE_DIR):
+            for name in os.listdir(CACHE_DIR):
+                path = os.path.join(CACHE_DIR, name)
+                if name == f"v{SCHEMA_VERSION}":
+                    continue
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+
+        entries = sorted(_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        # Window-end directories left empty by eviction
+        if os.path.isdir(_version_dir()):
+            for name in os.listdir(_version_dir()):
+                path = os.path.join(_version_dir(), name)
+                if os.path.isdir(path) and not os.listdir(path):
+                    os.rmdir(path)
+    return removed
+
+
+def roll_forward(window_end, days: int = 365) -> int:
+    """
+    Re-keys entries from the previous window end to window_end when the
+    window [end - days, end] slides forward by one day. A batter's
+    aggregates only change if they appear on a day Savant may have revised
+    since the previous run (the last SETTLE_DAYS days and the day entering
+    the window) or on the day leaving it, so every other entry is carried
+    over as is. Reads the store as is; if one of those days was never
+    pulled nothing is carried, so every batter is recomputed.
+    Returns the number of entries carried forward.
+    """
+    end = pd.to_datetime(window_end).normalize()
+    prev_dir = _end_dir(end - timedelta(days=1))
+    if not os.path.isdir(prev_dir):
+        return 0
+
+    unsettled = [end - timedelta(days=i) for i in range(1, SETTLE_DAYS + 1)]
+    leaving = end - timedelta(days=days + 1)
+    if not all(is_stored(day) for day in unsettled + [leaving]):
+        return 0
+
+    changed = set()
+    for day in [end] + unsettled + [leaving]:
+        batters = read_window(day, day, columns=['batter'], fetch_missing=False)
+        if 'batter' in batters.columns:
+            changed.update(pd.to_numeric(batters['batter'], errors='coerce').dropna().astype(int))
+
+    new_dir = _end_dir(end)
+    os.makedirs(new_dir, exist_ok=True)
+    carried = 0
+    # Entries that did change stay behind under the old key for evict() to collect
+    for name in os.listdir(prev_dir):
+        if not (name.startswith("batter_") and name.endswith(".parquet")):
+            continue
+        batter_id = int(name[len("batter_"):-len(".parquet")])
+        target = os.path.join(new_dir, name)
+        if batter_id in changed or os.path.exists(target):
+            continue
+        os.replace(os.path.join(prev_dir, name), target)
+        carried += 1
+    return carried
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print(f"🧹 Cleared {CACHE_DIR}")
+    else:
+        print(f"🧹 Evicted {evict()} overlay cache file(s) from {CACHE_DIR}")
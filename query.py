@@ -0,0 +1,108 @@
+# query.py
+
+import os
+import re
+from datetime import date
+import pandas as pd
+from layer_checkpoints import CHECKPOINT_DIR
+from exporters import EXPORT_DIR
+
+# <layer>_<date>[_<fingerprint>].parquet, but not the .delta files next to them
+CHECKPOINT_NAME = re.compile(r"^(?P<layer>.+?)_(?P<date>\d{4}-\d{2}-\d{2})(?:_[0-9a-f]+)?\.parquet$")
+
+
+def _duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise RuntimeError(
+            "query.py needs DuckDB for SQL over the layer checkpoints: pip install duckdb"
+        ) from e
+    return duckdb
+
+
+def latest_checkpoints(date_str: str = None, checkpoint_dir: str = CHECKPOINT_DIR) -> dict:
+    """
+    Newest checkpoint per layer dated on or before date_str (default today).
+    Returns {layer: path}.
+    """
+    date_str = date_str or date.today().isoformat()
+    newest = {}
+    if os.path.isdir(checkpoint_dir):
+        for name in os.listdir(checkpoint_dir):
+            m = CHECKPOINT_NAME.match(name)
+            if m is None or m.group("date") > date_str:
+                continue
+            path = os.path.join(checkpoint_dir, name)
+            key = (m.group("date"), os.path.getmtime(path))
+            if m.group("layer") not in newest or key > newest[m.group("layer")][0]:
+                newest[m.group("layer")] = (key, path)
+    return {layer: path for layer, (_, path) in sorted(newest.items())}
+
+
+def _sql_string(path: str) -> str:
+    return "'" + path.replace("\\", "/").replace("'", "''") + "'"
+
+
+def connect(date_str: str = None, checkpoint_dir: str = CHECKPOINT_DIR, export_dir: str = EXPORT_DIR):
+    """
+    In-memory DuckDB connection with a view per layer:
+      <layer>          the layer's newest checkpoint on or before date_str
+      <layer>_history  every date in the exported Parquet dataset (with a date column)
+    Views read the Parquet files lazily, so filters and column lists are
+    pushed down into the scan instead of loading whole layers.
+    """
+    duckdb = _duckdb()
+    con = duckdb.connect()
+    for layer, path in latest_checkpoints(date_str, checkpoint_dir).items():
+        con.execute(f'CREATE VIEW "{layer}" AS SELECT * FROM read_parquet({_sql_string(path)})')
+
+    dataset = os.path.join(export_dir, "dataset")
+    if os.path.isdir(dataset):
+        for part in sorted(os.listdir(dataset)):
+            if not part.startswith("layer="):
+                continue
+            layer = part[len("layer="):]
+            files = _sql_string(os.path.join(dataset, part, "*", "*.parquet"))
+            con.execute(
+                f'CREATE VIEW "{layer}_history" AS '
+                f"SELECT * FROM read_parquet({files}, hive_partitioning = true, union_by_name = true)"
+            )
+    return con
+
+
+def views(con) -> list:
+    return [row[0] for row in con.execute(
+        "SELECT view_name FROM duckdb_views() WHERE NOT internal ORDER BY view_name"
+    ).fetchall()]
+
+
+def query(sql: str, date_str: str = None) -> pd.DataFrame:
+    """
+    Runs SQL against the layer views and returns the result as a DataFrame, e.g.
+    query("SELECT Batter, xwOBA FROM layersix WHERE pitch_type = 'SL' AND xwOBA > .400")
+    """
+    con = connect(date_str)
+    try:
+        return con.execute(sql).df()
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="SQL over the layer checkpoints")
+    parser.add_argument("sql", nargs="?", help="query to run; omit to list the views")
+    parser.add_argument("--date", help="use checkpoints on or before this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    try:
+        if args.sql is None:
+            con = connect(args.date)
+            print("\n".join(views(con)) or "No layer checkpoints found")
+        else:
+            with pd.option_context("display.max_rows", 200, "display.width", 200):
+                print(query(args.sql, args.date))
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
@@ -0,0 +1,138 @@
+# schedule_snapshot.py
+
+import os
+import time
+import threading
+import pandas as pd
+from statsapi import get_json
+
+# Union of the hydrations layers one, six, eight and nine used to request separately
+SCHEDULE_HYDRATE = "probablePitcher(note),venue,weather"
+
+# Statuses after which a game can no longer change
+SETTLED_STATES = {"Final", "Game Over", "Postponed", "Cancelled", "Completed Early"}
+
+# A refresh re-pulls at most this often, and only while some game can still change
+REFRESH_SECONDS = 60
+
+# get_schedule re-pulls a slate older than this, so probable-pitcher changes
+# reach long-running processes (the app); "default" is the HTTP cache class
+# with the same lifetime, so the re-pull is not served from disk
+MAX_AGE_SECONDS = float(os.getenv("SCHEDULE_MAX_AGE_SECONDS", "900"))
+MAX_AGE_TTL = "default"
+
+GAME_COLUMNS = {
+    "gamePk":             "Int64",
+    "officialDate":       "string",
+    "gameDate":           "string",
+    "gameType":           "string",
+    "seriesDescription":  "string",
+    "seriesGameNumber":   "Int64",
+    "doubleHeader":       "string",
+    "status":             "string",
+    "abstractState":      "string",
+    "away_team":          "string",
+    "away_team_id":       "Int64",
+    "home_team":          "string",
+    "home_team_id":       "Int64",
+    "away_pitcher":       "string",
+    "away_pitcher_id":    "Int64",
+    "home_pitcher":       "string",
+    "home_pitcher_id":    "Int64",
+    "venue":              "string",
+    "venue_id":           "Int64",
+    "weather_condition":  "string",
+    "weather_temp":       "string",
+    "weather_wind":       "string",
+    "wind_speed":         "string",
+    "wind_direction":     "string",
+}
+
+_snapshots = {}
+_lock = threading.Lock()
+
+
+def parse_schedule(data: dict) -> pd.DataFrame:
+    """Flattens a hydrated /schedule response into one typed row per game."""
+    rows = []
+    for date_block in data.get("dates", []):
+        for game in date_block.get("games", []):
+            away = game["teams"]["away"]
+            home = game["teams"]["home"]
+            venue = game.get("venue", {})
+            weather = game.get("weather", {})
+            status = game.get("status", {})
+            rows.append({
+                "gamePk":            game.get("gamePk"),
+                "officialDate":      game.get("officialDate"),
+                "gameDate":          game.get("gameDate"),
+                "gameType":          game.get("gameType"),
+                "seriesDescription": game.get("seriesDescription"),
+                "seriesGameNumber":  game.get("seriesGameNumber"),
+                "doubleHeader":      game.get("doubleHeader"),
+                "status":            status.get("detailedState"),
+                "abstractState":     status.get("abstractGameState"),
+                "away_team":         away["team"]["name"],
+                "away_team_id":      away["team"].get("id"),
+                "home_team":         home["team"]["name"],
+                "home_team_id":      home["team"].get("id"),
+                "away_pitcher":      away.get("probablePitcher", {}).get("fullName"),
+                "away_pitcher_id":   away.get("probablePitcher", {}).get("id"),
+                "home_pitcher":      home.get("probablePitcher", {}).get("fullName"),
+                "home_pitcher_id":   home.get("probablePitcher", {}).get("id"),
+                "venue":             venue.get("name"),
+                "venue_id":          venue.get("id"),
+                "weather_condition": weather.get("condition"),
+                "weather_temp":      weather.get("temp"),
+                "weather_wind":      weather.get("wind"),
+                "wind_speed":        weather.get("windSpeed"),
+                "wind_direction":    weather.get("windDirection"),
+            })
+    games = pd.DataFrame(rows, columns=list(GAME_COLUMNS))
+    return games.astype(GAME_COLUMNS)
+
+
+def can_change(games: pd.DataFrame) -> bool:
+    """Whether any game on the slate can still change status."""
+    return bool((~games["status"].isin(SETTLED_STATES)).any())
+
+
+def _load(date_str: str, ttl: str = None) -> pd.DataFrame:
+    data = get_json(
+        "/api/v1/schedule",
+        params={"sportId": 1, "date": date_str, "hydrate": SCHEDULE_HYDRATE},
+        ttl=ttl
+    )
+    games = parse_schedule(data)
+    with _lock:
+        _snapshots[date_str] = {"games": games, "loaded_at": time.time()}
+    return games
+
+
+def get_schedule(date_str: str) -> pd.DataFrame:
+    """
+    The day's game table, fetched with every hydration the layers need and
+    shared by all of them. Kept per date for MAX_AGE_SECONDS (for good once
+    every game has settled), then pulled again.
+    """
+    with _lock:
+        snapshot = _snapshots.get(date_str)
+    if snapshot is None:
+        return _load(date_str, ttl=MAX_AGE_TTL)
+    if not can_change(snapshot["games"]) or time.time() - snapshot["loaded_at"] < MAX_AGE_SECONDS:
+        return snapshot["games"]
+    return _load(date_str, ttl=MAX_AGE_TTL)
+
+
+def refresh_schedule(date_str: str) -> pd.DataFrame:
+    """
+    Re-pulls the schedule only when a game can still change status and
+    the snapshot is older than REFRESH_SECONDS; otherwise returns it as is.
+    """
+    with _lock:
+        snapshot = _snapshots.get(date_str)
+    if snapshot is None:
+        return _load(date_str, ttl="live")
+    if not can_change(snapshot["games"]) or time.time() - snapshot["loaded_at"] < REFRESH_SECONDS:
+        return snapshot["games"]
+    return _load(date_str, ttl="live")
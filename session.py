@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 
 # Try to read DATABASE_URL from env, otherwise use a local SQLite file
 DB_URL = os.getenv(
@@ -8,3 +8,12 @@ DB_URL = os.getenv(
 )
 
 engine = create_engine(DB_URL, echo=False, future=True)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _):
+        # WAL lets readers keep querying while a layer load writes
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
@@ -0,0 +1,313 @@
+# snapshot_manager.py
+
+import os
+import time
+import json
+import shutil
+import threading
+from datetime import date
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from query import latest_checkpoints
+from exporters import arrow_table
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, every worker refreshes itself
+    fcntl = None
+
+# How often the background thread looks for a new day, new checkpoints or
+# an edited system prompt; a failed load is retried after RETRY_SECONDS
+POLL_SECONDS = float(os.getenv("SNAPSHOT_POLL_SECONDS", "30"))
+RETRY_SECONDS = float(os.getenv("SNAPSHOT_RETRY_SECONDS", "60"))
+
+# Loaded snapshots are persisted here so a restarted or newly forked worker
+# can serve the last one immediately, and so workers share one refresh:
+#   snapshots/snapshot_<date>_<created ms>/meta.json     (everything but frames)
+#   snapshots/snapshot_<date>_<created ms>/<key>.arrow   (one per DataFrame)
+#   snapshots/.refresh.lock   (held by the worker doing the load)
+# Frames are uncompressed Arrow IPC files opened memory-mapped, so every
+# worker on the host reads the same page-cache copy instead of its own
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_KEEP = 3
+LOCK_FILE = ".refresh.lock"
+
+# A snapshot older than this (or from another day) is reported as stale
+STALE_SECONDS = float(os.getenv("SNAPSHOT_STALE_SECONDS", str(6 * 3600)))
+
+# First existing file wins
+PROMPT_PATHS = [os.getenv("SYSTEM_PROMPT_PATH", "prompts/system_prompt.txt"), "system_prompt.txt"]
+DEFAULT_PROMPT = "You are Free Agent Analytics. Respond with overlays using loaded data."
+
+# The live snapshot is an immutable dict; a refresh builds a complete new one
+# and replaces the reference, so a request that grabbed current() keeps a
+# consistent view for its whole lifetime
+_EMPTY = {
+    "version": 0,
+    "date": None,
+    "loaded_at": None,
+    # Frames come back as memory-mapped pyarrow Tables
+    "data": {},
+    "system_prompt": DEFAULT_PROMPT,
+}
+
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_current = _EMPTY
+_state = {
+    "loader": None,
+    "thread": None,
+    "signature": None,
+    "prompt_mtime": None,
+    "last_attempt": 0.0,
+    "last_error": None,
+}
+
+
+def current() -> dict:
+    """The snapshot requests should read from; never blocks on a refresh."""
+    return _current
+
+
+def status() -> dict:
+    """Readiness and staleness of the live snapshot, for the health endpoint."""
+    snap = _current
+    age = time.time() - snap["loaded_at"] if snap["loaded_at"] else None
+    return {
+        "ready":       snap["date"] is not None,
+        "stale":       snap["date"] != date.today().isoformat() or age is None or age > STALE_SECONDS,
+        "version":     snap["version"],
+        "date":        snap["date"],
+        "loaded_at":   snap["loaded_at"],
+        "age_seconds": round(age, 1) if age is not None else None,
+        "refreshing":  _refresh_lock.locked(),
+        "tables":      {k: v.num_rows for k, v in snap["data"].items() if isinstance(v, pa.Table)},
+        "last_error":  _state["last_error"],
+    }
+
+
+def _swap(**changes) -> dict:
+    global _current
+    with _lock:
+        _current = {**_current, **changes, "version": _current["version"] + 1}
+        return _current
+
+
+def _prompt_file():
+    for path in PROMPT_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _check_prompt() -> bool:
+    """Reloads the system prompt if its file changed. Returns True on a swap."""
+    path = _prompt_file()
+    mtime = (path, os.path.getmtime(path)) if path else None
+    if mtime == _state["prompt_mtime"]:
+        return False
+    try:
+        text = open(path, "r", encoding="utf-8").read() if path else DEFAULT_PROMPT
+    except OSError as e:
+        print(f"⚠️ Could not read system prompt {path}: {e}")
+        return False
+    _state["prompt_mtime"] = mtime
+    _swap(system_prompt=text)
+    print(f"📝 System prompt loaded from {path or 'defaults'}")
+    return True
+
+
+def _signature(date_str: str) -> list:
+    # Plain lists, so it compares equal after a round trip through meta.json
+    return [date_str, [[layer, path] for layer, path in sorted(latest_checkpoints(date_str).items())]]
+
+
+def _persisted() -> list:
+    """Complete persisted snapshot directories, newest first."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    paths = [
+        os.path.join(SNAPSHOT_DIR, n) for n in os.listdir(SNAPSHOT_DIR)
+        if n.startswith("snapshot_") and not n.endswith(".tmp")
+        and os.path.exists(os.path.join(SNAPSHOT_DIR, n, "meta.json"))
+    ]
+    return sorted(paths, reverse=True)
+
+
+def _persist(date_str: str, signature: list, data: dict, loaded_at: float) -> str:
+    """Writes the snapshot directory (atomically, via a rename) and prunes old ones."""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = os.path.join(SNAPSHOT_DIR, f"snapshot_{date_str}_{int(loaded_at * 1000)}")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(tmp_path)
+
+    rest = {}
+    for key, value in data.items():
+        if isinstance(value, pd.DataFrame):
+            value = arrow_table(value)
+        if isinstance(value, pa.Table):
+            feather.write_feather(value, os.path.join(tmp_path, f"{key}.arrow"), compression="uncompressed")
+        else:
+            rest[key] = value
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"date": date_str, "signature": signature, "data": rest, "loaded_at": loaded_at}, f)
+    os.replace(tmp_path, path)
+
+    # Workers still mapping a pruned snapshot keep reading it until they
+    # move on; unlinking only drops the directory entry
+    for old in _persisted()[SNAPSHOT_KEEP:]:
+        shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+def _open(path: str) -> dict:
+    """Reads a persisted snapshot, memory-mapping its tables."""
+    with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    for name in sorted(os.listdir(path)):
+        if name.endswith(".arrow"):
+            saved["data"][name[:-len(".arrow")]] = feather.read_table(os.path.join(path, name), memory_map=True)
+    return saved
+
+
+def _adopt(signature: list = None) -> bool:
+    """
+    Swaps in the newest persisted snapshot (only if it matches signature,
+    when given). Returns True on a swap.
+    """
+    for path in _persisted()[:1]:
+        try:
+            saved = _open(path)
+        except Exception as e:
+            print(f"⚠️ Could not read snapshot {path}: {e}")
+            return False
+        if signature is not None and saved["signature"] != signature:
+            return False
+        if saved["loaded_at"] == _current["loaded_at"]:
+            return False
+        _state["signature"] = saved["signature"]
+        snap = _swap(date=saved["date"], loaded_at=saved["loaded_at"], data=saved["data"])
+        print(f"📦 Snapshot v{snap['version']} adopted from {path}")
+        return True
+    return False
+
+
+def _try_lock():
+    """Cross-process refresh lock; returns the open lock file, or None if another worker holds it."""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    handle = open(os.path.join(SNAPSHOT_DIR, LOCK_FILE), "a")
+    if fcntl is None:
+        return handle
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def refresh(force: bool = False) -> bool:
+    """
+    Loads a new data snapshot when the day rolled over or the layer
+    checkpoints changed (or always, with force). The previous snapshot keeps
+    serving until the new one is complete, and after a failure.
+    Returns True when a new snapshot was swapped in.
+    """
+    # One refresh at a time; a concurrent caller just keeps the current snapshot
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    try:
+        return _refresh(force)
+    finally:
+        _refresh_lock.release()
+
+
+def _refresh(force: bool) -> bool:
+    _check_prompt()
+    loader = _state["loader"]
+    if loader is None:
+        return False
+
+    date_str = date.today().isoformat()
+    signature = _signature(date_str)
+    if not force:
+        if signature == _state["signature"]:
+            return False
+        # Another worker may already have loaded exactly this
+        if _adopt(signature):
+            return True
+        if _state["last_error"] and time.time() - _state["last_attempt"] < RETRY_SECONDS:
+            return False
+
+    lock = _try_lock()
+    if lock is None:
+        # Another worker is loading; its snapshot is adopted on a later poll
+        return False
+    try:
+        if not force and _adopt(signature):
+            return True
+
+        _state["last_attempt"] = time.time()
+        try:
+            data = loader(date_str)
+        except Exception as e:
+            _state["last_error"] = str(e)
+            print(f"⚠️ Snapshot load for {date_str} failed, still serving v{_current['version']}: {e}")
+            return False
+
+        loaded_at = time.time()
+        try:
+            # Serve the mapped copy too, so this worker's pandas frames can go
+            data = _open(_persist(date_str, signature, data, loaded_at))["data"]
+        except Exception as e:
+            print(f"⚠️ Could not persist snapshot: {e}")
+    finally:
+        lock.close()
+
+    _state["signature"] = signature
+    _state["last_error"] = None
+    snap = _swap(date=date_str, loaded_at=loaded_at, data=data)
+    print(f"🔁 Snapshot v{snap['version']} live for {date_str}")
+    return True
+
+
+def _run(poll_seconds: float) -> None:
+    while True:
+        try:
+            refresh()
+        except Exception as e:
+            print(f"⚠️ Snapshot refresh error: {e}")
+        time.sleep(poll_seconds)
+
+
+def _after_fork() -> None:
+    # A forked worker (gunicorn --preload) inherits the parent's state but
+    # not its refresh thread, and possibly a held lock; start() runs afresh
+    global _lock, _refresh_lock
+    _lock = threading.Lock()
+    _refresh_lock = threading.Lock()
+    _state["thread"] = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def start(loader, poll_seconds: float = POLL_SECONDS) -> None:
+    """
+    Starts the background refresher once per process (cheap to call again,
+    e.g. on every request). loader(date_str) returns
+    the data dict for a day. The newest persisted snapshot, if any, is served
+    straight away (possibly stale); the fresh load happens in the background.
+    """
+    with _lock:
+        _state["loader"] = loader
+        if _state["thread"] is not None:
+            return
+        _state["thread"] = threading.Thread(
+            target=_run, args=(poll_seconds,), name="snapshot-refresh", daemon=True
+        )
+    _check_prompt()
+    _adopt()
+    _state["thread"].start()
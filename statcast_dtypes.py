@@ -0,0 +1,81 @@
+# statcast_dtypes.py
+
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype, is_float_dtype, is_integer_dtype, is_object_dtype, is_string_dtype,
+    CategoricalDtype
+)
+
+# Enumerations that are always stored as categoricals
+CATEGORY_COLUMNS = [
+    'events', 'description', 'pitch_type', 'pitch_name', 'home_team', 'away_team',
+    'player_name', 'stand', 'p_throws', 'type', 'bb_type', 'inning_topbot',
+    'game_type', 'if_fielding_alignment', 'of_fielding_alignment'
+]
+
+# Other text columns become categoricals when at most this share of values is unique
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def _is_text(series: pd.Series) -> bool:
+    return is_object_dtype(series.dtype) or is_string_dtype(series.dtype)
+
+
+def compact_statcast(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns a copy of a Statcast frame with categoricals for enumerations,
+    float32 for measurements and the smallest integer type for ids and counts.
+    Bool flags and existing categoricals are left as they are.
+    """
+    out = df.copy()
+    for col in out.columns:
+        series = out[col]
+        if isinstance(series.dtype, CategoricalDtype) or is_bool_dtype(series.dtype):
+            continue
+        if _is_text(series):
+            if col in CATEGORY_COLUMNS or (
+                len(series) and series.nunique(dropna=True) <= CATEGORY_MAX_UNIQUE_RATIO * len(series)
+            ):
+                out[col] = series.astype('category')
+        elif is_float_dtype(series.dtype):
+            out[col] = series.astype('float32')
+        elif is_integer_dtype(series.dtype):
+            out[col] = pd.to_numeric(series, downcast='integer')
+    return out
+
+
+def concat_compact(frames: list) -> pd.DataFrame:
+    """
+    Concatenates compacted frames without losing categoricals: pd.concat falls
+    back to object when categories differ, so categories are unified first.
+    """
+    if not frames:
+        return pd.DataFrame()
+    for col in frames[0].columns:
+        if not all(
+            col in f.columns and isinstance(f[col].dtype, CategoricalDtype) for f in frames
+        ):
+            continue
+        categories = pd.Index(
+            pd.unique(pd.concat([f[col].cat.categories.to_series() for f in frames]))
+        )
+        for f in frames:
+            f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bytes per column before and after compaction, largest savings first.
+    """
+    b = before.memory_usage(index=False, deep=True)
+    a = after.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'column':       b.index,
+        'dtype_before': [str(before[c].dtype) for c in b.index],
+        'dtype_after':  [str(after[c].dtype) if c in after.columns else None for c in b.index],
+        'bytes_before': b.values,
+        'bytes_after':  a.reindex(b.index).values,
+    })
+    report['bytes_saved'] = report['bytes_before'] - report['bytes_after']
+    return report.sort_values('bytes_saved', ascending=False, ignore_index=True)
@@ -0,0 +1,148 @@
+# statcast_engine.py
+
+import pandas as pd
+import numpy as np
+from pandas.api.types import CategoricalDtype, is_bool_dtype, is_integer_dtype
+from datetime import timedelta
+from statcast_store import read_window
+
+# Pitch-level flags shared by every Statcast layer: name -> (source columns, fn(df) -> bool Series).
+# Each flag is computed at most once per build, whichever layers ask for it.
+HIT_EVENTS = ['single', 'double', 'triple', 'home_run']
+SWING_DESCRIPTIONS = [
+    'swinging_strike', 'foul', 'foul_tip',
+    'hit_into_play', 'hit_into_play_score', 'hit_into_play_no_out'
+]
+WHIFF_DESCRIPTIONS = ['swinging_strike', 'swinging_strike_blocked']
+NON_AB_EVENTS = ['walk', 'hit_by_pitch', 'sac_fly', 'sac_bunt', 'intent_walk', 'catcher_interf']
+
+FLAGS = {
+    'hard_hit':   (['launch_speed'], lambda d: d['launch_speed'] >= 95),
+    'barrel':     (['launch_speed', 'launch_angle'],
+                   lambda d: (d['launch_speed'] >= 98) & d['launch_angle'].between(26, 30)),
+    'is_swing':   (['description'], lambda d: d['description'].isin(SWING_DESCRIPTIONS)),
+    'is_whiff':   (['description'], lambda d: d['description'].isin(WHIFF_DESCRIPTIONS)),
+    'k_desc':     (['description'], lambda d: d['description'].str.contains('strikeout', na=False)),
+    'bb_desc':    (['description'], lambda d: d['description'].str.contains('walk', na=False)),
+    'is_k':       (['events'], lambda d: d['events'] == 'strikeout'),
+    'is_bb':      (['events'], lambda d: d['events'] == 'walk'),
+    'is_hr':      (['events'], lambda d: d['events'] == 'home_run'),
+    'is_single':  (['events'], lambda d: d['events'] == 'single'),
+    'is_double':  (['events'], lambda d: d['events'] == 'double'),
+    'is_triple':  (['events'], lambda d: d['events'] == 'triple'),
+    'is_hit':     (['events'], lambda d: d['events'].isin(HIT_EVENTS)),
+    'is_ab':      (['events'], lambda d: ~d['events'].isin(NON_AB_EVENTS)),
+    'is_sb':      (['events'], lambda d: d['events'] == 'stolen_base'),
+    'is_cs':      (['events'], lambda d: d['events'] == 'caught_stealing'),
+    'is_starter': (['inning', 'outs_when_up'],
+                   lambda d: (d['inning'] == 1) & (d['outs_when_up'] == 0)),
+}
+
+# Text columns are left alone; everything else read for a layer is coerced to numeric
+TEXT_COLUMNS = {'events', 'description', 'pitch_type', 'home_team', 'away_team', 'player_name'}
+
+LAYERS = {}
+
+
+def register_layer(
+    name: str,
+    days: int,
+    group_keys: list,
+    aggregations: dict,
+    columns: list = None,
+    flags: list = None,
+    rows=None,
+    finalize=None
+) -> None:
+    """
+    Registers a Statcast-derived layer with the engine.
+    :param days: look-back window ending on the build date.
+    :param aggregations: pandas named aggregations, {output: (column, func)}.
+    :param columns: raw Statcast columns the layer reads (besides group keys and flags).
+    :param rows: optional fn(frame) -> boolean mask applied before grouping.
+    :param finalize: optional fn(stats) -> DataFrame applied to the grouped result.
+    """
+    LAYERS[name] = {
+        'days': days,
+        'group_keys': list(group_keys),
+        'aggregations': dict(aggregations),
+        'columns': list(columns or []),
+        'flags': list(flags or []),
+        'rows': rows,
+        'finalize': finalize,
+    }
+
+
+def _layer_columns(spec: dict) -> list:
+    cols = spec['group_keys'] + spec['columns'] + spec['flags']
+    cols += [src for src, _ in spec['aggregations'].values()]
+    return list(dict.fromkeys(cols))
+
+
+def build_layers(end_date, names: list = None) -> dict:
+    """
+    Builds every requested Statcast layer from a single read of the local store.
+    Flags are computed once over the widest window, then each layer is
+    sliced to its own window and grouped.
+    Returns {layer name: DataFrame}.
+    """
+    specs = {name: LAYERS[name] for name in (names or LAYERS)}
+    if not specs:
+        return {}
+
+    end = pd.to_datetime(end_date).normalize()
+    start = end - timedelta(days=max(spec['days'] for spec in specs.values()))
+    flags = list(dict.fromkeys(f for spec in specs.values() for f in spec['flags']))
+
+    raw_cols = set()
+    for spec in specs.values():
+        raw_cols.update(c for c in _layer_columns(spec) if c not in FLAGS)
+    for flag in flags:
+        raw_cols.update(FLAGS[flag][0])
+    raw_cols = sorted(raw_cols)
+
+    print(f"🧮 Building {', '.join(specs)} from one Statcast scan ({start.date()} → {end.date()})…")
+    raw = read_window(start, end, columns=raw_cols + ['game_date'])
+
+    absent = [col for col in raw_cols if col not in raw.columns]
+    for col in raw_cols:
+        if col in absent:
+            raw[col] = pd.Series(np.nan, index=raw.index, dtype=object)
+        if col not in TEXT_COLUMNS:
+            raw[col] = pd.to_numeric(raw[col], errors='coerce')
+    for flag in flags:
+        raw[flag] = FLAGS[flag][1](raw).fillna(False).astype(bool)
+
+    raw_dates = pd.to_datetime(raw['game_date'])
+    out = {}
+    for name, spec in specs.items():
+        cols = _layer_columns(spec)
+        window = raw_dates >= end - timedelta(days=spec['days'])
+        frame = raw[cols] if window.all() else raw.loc[window, cols]
+        if spec['rows'] is not None:
+            frame = frame[spec['rows'](frame)]
+
+        # Only aggregate fields the store actually holds
+        aggregations = {
+            out_col: (src, how) for out_col, (src, how) in spec['aggregations'].items()
+            if src not in absent
+        }
+        stats = (
+            frame.groupby(spec['group_keys'], observed=True)
+                 .agg(**aggregations)
+                 .reset_index()
+        )
+        # The store hands back compact dtypes; layer outputs keep plain ones
+        for col in stats.columns:
+            if isinstance(stats[col].dtype, CategoricalDtype):
+                stats[col] = stats[col].astype(object)
+            elif stats[col].dtype == np.float32:
+                stats[col] = stats[col].astype(np.float64)
+            elif is_integer_dtype(stats[col].dtype) and not is_bool_dtype(stats[col].dtype):
+                stats[col] = stats[col].astype(np.int64)
+        if spec['finalize'] is not None:
+            stats = spec['finalize'](stats)
+        out[name] = stats
+        print(f"✅ {name}: {len(stats)} rows from {len(frame)} pitches")
+
+    return out
@@ -0,0 +1,176 @@
+# statcast_store.py
+
+import os
+import time
+import pandas as pd
+import pyarrow.parquet as pq
+from pybaseball import statcast
+from statcast_dtypes import compact_statcast, concat_compact, memory_report
+from datetime import date, timedelta
+
+# Local pitch-level Statcast store, one Parquet partition per game_date:
+#   statcast_store/game_date=YYYY-MM-DD/part.parquet
+#   statcast_store/game_date=YYYY-MM-DD/_COMPLETE   (day is final, never re-pulled)
+STORE_DIR = os.getenv("STATCAST_STORE_DIR", "statcast_store")
+PART_FILE = "part.parquet"
+COMPLETE_MARKER = "_COMPLETE"
+
+# Savant keeps revising the most recent games overnight, so the last
+# SETTLE_DAYS days are re-pulled on every refresh instead of being frozen.
+SETTLE_DAYS = 2
+
+# Unsettled days pulled by this process count as present for this long, so
+# the layers of one export share a single pull instead of one each
+UNSETTLED_TTL_SECONDS = float(os.getenv("STATCAST_UNSETTLED_TTL_SECONDS", "3600"))
+
+# Days per statcast() call; each chunk is compacted and written before the
+# next one is pulled, so a full-window fill never holds more than this raw
+CHUNK_DAYS = 7
+
+# Months with no MLB games: an empty pull for these is an off-season day, not
+# an outage, so the day can still be marked complete
+OFF_SEASON_MONTHS = {12, 1, 2}
+
+# day -> time.monotonic() of this process's last pull of an unsettled day
+_pulled = {}
+
+
+def _to_date(value) -> date:
+    return pd.to_datetime(value).date()
+
+
+def _days(start, end) -> list:
+    start_d, end_d = _to_date(start), _to_date(end)
+    return [start_d + timedelta(days=i) for i in range((end_d - start_d).days + 1)]
+
+
+def _day_dir(day: date) -> str:
+    return os.path.join(STORE_DIR, f"game_date={day.isoformat()}")
+
+
+def _runs(days: list) -> list:
+    """
+    Collapse a sorted list of dates into (first, last) runs of consecutive
+    days, each at most CHUNK_DAYS long.
+    """
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][1] == timedelta(days=1) and (day - runs[-1][0]).days < CHUNK_DAYS:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(r) for r in runs]
+
+
+def missing_days(start, end) -> list:
+    """
+    Days in [start, end] that are not yet stored as complete, leaving out
+    unsettled days this process pulled within UNSETTLED_TTL_SECONDS.
+    """
+    now = time.monotonic()
+    return [
+        day for day in _days(start, end)
+        if not os.path.exists(os.path.join(_day_dir(day), COMPLETE_MARKER))
+        and (day not in _pulled or now - _pulled[day] > UNSETTLED_TTL_SECONDS)
+    ]
+
+
+def is_stored(day) -> bool:
+    """Whether the day has been pulled into the store at least once."""
+    return os.path.isdir(_day_dir(_to_date(day)))
+
+
+def _write_days(raw: pd.DataFrame, first: date, last: date) -> None:
+    """
+    Stores one pulled run of days. A day is marked complete (once settled)
+    only if it came back with rows, or is an off-day inside a run that did
+    return rows, or falls in OFF_SEASON_MONTHS. A run that came back empty
+    outside the off-season is treated as a failed pull: nothing is written,
+    so those days are pulled again next time.
+    """
+    settled = date.today() - timedelta(days=SETTLE_DAYS)
+    if raw is None or raw.empty or 'game_date' not in raw.columns:
+        raw = pd.DataFrame({'game_date': pd.Series(dtype='datetime64[ns]')})
+
+    compact = compact_statcast(raw)
+    if not raw.empty:
+        report = memory_report(raw, compact)
+        print(
+            f"🗜️ Compacted {first} → {last}: "
+            f"{report['bytes_before'].sum() / 1e6:.1f} MB → {report['bytes_after'].sum() / 1e6:.1f} MB"
+        )
+    del raw
+
+    pulled_rows = not compact.empty
+    parts = {
+        day.date(): part
+        for day, part in compact.groupby(pd.to_datetime(compact['game_date']).dt.normalize())
+    }
+    for day in _days(first, last):
+        if not pulled_rows and day.month not in OFF_SEASON_MONTHS:
+            continue
+        day_dir = _day_dir(day)
+        os.makedirs(day_dir, exist_ok=True)
+        path = os.path.join(day_dir, PART_FILE)
+        part = parts.get(day)
+        if part is not None:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            part.drop(columns=['game_date']).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        elif os.path.exists(path):
+            # A re-pull with no rows for the day: the old rows were revised away
+            os.remove(path)
+        if day <= settled:
+            open(os.path.join(day_dir, COMPLETE_MARKER), "w").close()
+        else:
+            _pulled[day] = time.monotonic()
+
+
+def ensure_window(start, end) -> int:
+    """
+    Downloads every day in [start, end] that the store does not already hold,
+    one statcast() call per run of consecutive missing days (at most
+    CHUNK_DAYS each), compacting and writing each run before the next.
+    Returns the number of days pulled.
+    """
+    missing = missing_days(start, end)
+    for first, last in _runs(missing):
+        print(f"⏬ Pulling Statcast {first} → {last} into {STORE_DIR}…")
+        raw = statcast(start_dt=first.isoformat(), end_dt=last.isoformat())
+        _write_days(raw, first, last)
+    return len(missing)
+
+
+def read_window(start, end, columns: list = None, fetch_missing: bool = True) -> pd.DataFrame:
+    """
+    Returns pitch-level Statcast rows with game_date in [start, end] from the
+    local store, pulling any missing days first unless fetch_missing=False.
+    Rows come back with the compact dtypes from statcast_dtypes.
+    :param columns: optional projection; columns absent from a partition are skipped.
+    """
+    if fetch_missing:
+        ensure_window(start, end)
+
+    frames = []
+    for day in _days(start, end):
+        path = os.path.join(_day_dir(day), PART_FILE)
+        if not os.path.exists(path):
+            continue
+        if columns is None:
+            table = pq.read_table(path)
+        else:
+            present = set(pq.read_schema(path).names)
+            table = pq.read_table(path, columns=[c for c in columns if c in present])
+        part = table.to_pandas()
+        part['game_date'] = pd.Timestamp(day)
+        frames.append(part)
+
+    if not frames:
+        return pd.DataFrame(columns=columns) if columns else pd.DataFrame()
+    return concat_compact(frames)
+
+
+if __name__ == "__main__":
+    end = date.today()
+    pulled = ensure_window(end - timedelta(days=1000), end)
+    print(f"✅ Statcast store up to date ({pulled} day(s) pulled)")
@@ -0,0 +1,133 @@
+# statsapi.py
+
+import asyncio
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import http_cache
+
+STATSAPI_BASE = "https://statsapi.mlb.com"
+DEFAULT_TIMEOUT = 15
+MAX_CONCURRENCY = 16
+
+# Retry transient failures with exponential backoff (0.5s, 1s, 2s)
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    raise_on_status=False
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide keep-alive session, so every call after the first reuses
+    a pooled TCP+TLS connection instead of paying a new handshake.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=MAX_CONCURRENCY,
+                max_retries=RETRY
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def _url(path: str) -> str:
+    return path if path.startswith("http") else f"{STATSAPI_BASE}{path}"
+
+
+def get(
+    path: str,
+    params: dict = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    headers: dict = None
+) -> requests.Response:
+    """GET a StatsAPI path (e.g. "/api/v1/schedule") or an absolute URL."""
+    return get_session().get(_url(path), params=params, timeout=timeout, headers=headers)
+
+
+def get_json(
+    path: str,
+    params: dict = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: bool = True,
+    ttl: str = None
+):
+    """
+    GET and decode JSON through the on-disk response cache.
+    Fresh entries are served without a request; stale ones are revalidated
+    with If-None-Match / If-Modified-Since when the server gave a validator.
+    :param ttl: TTL class override (see http_cache.TTL_CLASSES).
+    """
+    url = _url(path)
+    entry = http_cache.lookup(url, params) if cache else None
+    if entry is not None and http_cache.is_fresh(entry, ttl):
+        http_cache.record_hit()
+        return entry["body"]
+    if cache:
+        http_cache.record_miss()
+
+    resp = get(path, params=params, timeout=timeout, headers=http_cache.conditional_headers(entry))
+    if resp.status_code == 304 and entry is not None:
+        http_cache.touch(url, params, entry, ttl)
+        return entry["body"]
+    resp.raise_for_status()
+    body = resp.json()
+    if cache:
+        http_cache.store(url, params, body, resp.headers, ttl)
+    return body
+
+
+async def get_json_async(
+    calls: list,
+    max_concurrency: int = MAX_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    return_exceptions: bool = True
+) -> list:
+    """
+    Runs get_json for every (path, params) in calls with at most
+    max_concurrency requests in flight. Results keep the order of calls;
+    failures come back as exception objects when return_exceptions=True.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        async def fetch(path, params):
+            async with semaphore:
+                return await loop.run_in_executor(
+                    executor, partial(get_json, path, params, timeout)
+                )
+
+        return await asyncio.gather(
+            *(fetch(path, params) for path, params in calls),
+            return_exceptions=return_exceptions
+        )
+
+
+def get_many(
+    calls: list,
+    max_concurrency: int = MAX_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    return_exceptions: bool = True
+) -> list:
+    """Blocking wrapper around get_json_async for the layer fetchers."""
+    if not calls:
+        return []
+    return asyncio.run(
+        get_json_async(calls, max_concurrency, timeout, return_exceptions)
+    )
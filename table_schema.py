@@ -0,0 +1,220 @@
+# table_schema.py
+
+import os
+import re
+import json
+import pandas as pd
+from sqlalchemy import MetaData, Table, Column, BigInteger, Float, Text, Index, inspect
+from sqlalchemy.exc import SQLAlchemyError
+
+# Column manifest for every layer: {layer: {"rows", "columns", "sample_data"}}.
+# sample_data holds a list of example values for text columns and
+# {"min", "max", "mean"} for numeric ones.
+SCHEMA_PATH = os.getenv("DATA_SCHEMA_PATH", "data_schema.json")
+
+# Manifest layer name -> database table name
+TABLE_NAMES = {
+    "layerone":    "layer_one",
+    "layertwo":    "layer_two",
+    "layerthreeA": "layer_threeA",
+    "layerfour":   "layer_four",
+    "layerfive":   "layer_five",
+    "layersix":    "layer_six",
+    "layerseven":  "layer_seven",
+    "layereight":  "layer_eight",
+    "layerten":    "layer_ten",
+    "layereleven": "layer_eleven",
+    "layer12":     "layer_12",
+    "layer13":     "layer_13",
+}
+
+# One row per key, matching how each layer is built (and upsert_df's index_cols)
+PRIMARY_KEYS = {
+    "layerone":    ["Game Time (UTC)", "Away Team", "Home Team"],
+    "layertwo":    ["Player ID", "Pitch Type"],
+    "layerthreeA": ["Season", "Team", "Player ID"],
+    "layerfour":   ["Pitcher ID"],
+    "layerfive":   ["Team"],
+    "layersix":    ["Game Time", "Batter ID", "Opposing Pitcher ID", "pitch_type"],
+    "layerseven":  ["Team"],
+    "layereight":  ["GamePk"],
+    "layerten":    ["Team", "Season", "Split"],
+    "layereleven": ["batter", "pitcher"],
+    "layer12":     ["GamePk", "Bookmaker", "MarketType", "TeamOrPlayer"],
+    "layer13":     ["Batter ID"],
+}
+
+# Join keys from the system prompt's layer map: pitcher IDs fan out from
+# LayerOne into Two/Four/Six/Eleven, team names into ThreeA/Five/Seven/Eight/Ten,
+# batter IDs into Six/Thirteen. Keys already led by the primary key are skipped.
+JOIN_INDEXES = {
+    "layerone":    [["Away Pitcher ID"], ["Home Pitcher ID"], ["Away Team"], ["Home Team"]],
+    "layertwo":    [["Player ID", "Pitch Type"]],
+    "layerthreeA": [["Team"]],
+    "layerfour":   [["Pitcher ID"]],
+    "layerfive":   [["Team"]],
+    "layersix":    [["Batter ID"], ["Opposing Pitcher ID", "pitch_type"]],
+    "layerseven":  [["Team"]],
+    "layereight":  [["Home Team"], ["Away Team"]],
+    "layerten":    [["Team"]],
+    "layereleven": [["pitcher"]],
+    "layer12":     [["HomeTeam"], ["AwayTeam"]],
+    "layer13":     [["Batter ID"]],
+}
+
+# Columns whose manifest sample is empty, so their type cannot be inferred
+TYPE_OVERRIDES = {
+    "layerthreeA": {"Player ID": BigInteger},
+    "layerseven": {"Spin Rate": Float},
+    "layereight": {"Wind Speed (mph)": Float, "Wind Direction": Text},
+}
+
+# Numeric columns holding whole-number identifiers ("Pitcher ID", "GamePk", "batter")
+_INTEGER_NAME = re.compile(r"(id|pk)$|^(batter|pitcher|season)$", re.IGNORECASE)
+# Rates, averages and measurements: fractional even when the manifest sample
+# happens to be whole ("HardHit%" 0-100, "Avg Launch Angle", "BB/K" all zero)
+_FRACTIONAL_NAME = re.compile(
+    r"%|/|avg|obp|slg|ops|iso|babip|seca|oba|\brate\b|\b(la|ev)\b|velo|spin|angle|distance|speed|temp|break|extension",
+    re.IGNORECASE
+)
+
+
+def load_manifest(path: str = SCHEMA_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def column_type(layer: str, column: str, sample):
+    """
+    SQL type for a manifest column, inferred from its sample_data entry:
+    whole-number samples are BigInteger (ids, game keys and counts such as
+    PA, H or events) unless the name marks a rate or measurement.
+    """
+    override = TYPE_OVERRIDES.get(layer, {}).get(column)
+    if override is not None:
+        return override
+    if isinstance(sample, dict) and {"min", "max"} <= set(sample):
+        whole = float(sample["min"]).is_integer() and float(sample["max"]).is_integer()
+        integral = _INTEGER_NAME.search(column) or not _FRACTIONAL_NAME.search(column)
+        return BigInteger if whole and integral else Float
+    return Text
+
+
+def _index_name(table_name: str, cols: list) -> str:
+    return f"ix_{table_name}_{'_'.join(cols)}".replace(" ", "_")
+
+
+def _unique_name(table_name: str, cols: list) -> str:
+    # Same name _sqlite_upsert gives its conflict index, so neither path adds a second one
+    return f"ux_{table_name}_{'_'.join(cols)}"
+
+
+def _covered(cols: list, existing: list) -> bool:
+    """Whether some existing key or index already starts with cols."""
+    return any(list(key[:len(cols)]) == list(cols) for key in existing)
+
+
+def build_metadata(manifest: dict = None) -> MetaData:
+    """Typed Table objects, with primary keys and join indexes, for every layer."""
+    manifest = manifest if manifest is not None else load_manifest()
+    metadata = MetaData()
+    for layer, spec in manifest.items():
+        table_name = TABLE_NAMES.get(layer, layer)
+        keys = PRIMARY_KEYS.get(layer, [])
+        samples = spec.get("sample_data", {})
+        columns = [
+            Column(col, column_type(layer, col, samples.get(col)), primary_key=col in keys)
+            for col in spec["columns"]
+        ]
+        table = Table(table_name, metadata, *columns)
+        for cols in JOIN_INDEXES.get(layer, []):
+            if not _covered(cols, [keys]):
+                Index(_index_name(table_name, cols), *(table.c[c] for c in cols))
+    return metadata
+
+
+def create_all(engine, manifest: dict = None) -> list:
+    """
+    Creates every layer table that does not exist yet. Issues DDL only;
+    nothing is fetched. Returns the names of the tables created.
+    """
+    metadata = build_metadata(manifest)
+    existing = set(inspect(engine).get_table_names())
+    metadata.create_all(engine, checkfirst=True)
+    return [name for name in metadata.tables if name not in existing]
+
+
+def ensure_indexes(engine, table_names: list = None) -> list:
+    """
+    Adds the layer's primary key, as a unique index, to existing tables that
+    lack one (to_sql creates none, and ON CONFLICT needs it on every
+    dialect), then any declared join index they are missing. Keys whose
+    columns the table lacks, or that an existing index already leads with,
+    are skipped. Returns the names of the indexes created.
+    """
+    insp = inspect(engine)
+    created = []
+    for layer, table_name in TABLE_NAMES.items():
+        if table_names is not None and table_name not in table_names:
+            continue
+        if not insp.has_table(table_name):
+            continue
+        columns = {col["name"] for col in insp.get_columns(table_name)}
+        indexes = insp.get_indexes(table_name)
+        existing = [ix["column_names"] for ix in indexes if not ix.get("unique")]
+        unique = [ix["column_names"] for ix in indexes if ix.get("unique")]
+        unique += [uc["column_names"] for uc in insp.get_unique_constraints(table_name)]
+        unique.append(insp.get_pk_constraint(table_name).get("constrained_columns") or [])
+        existing += unique
+
+        keys = PRIMARY_KEYS.get(layer, [])
+        if keys and set(keys) <= columns and not any(set(u) == set(keys) for u in unique):
+            name = _unique_name(table_name, keys)
+            if _create_index(engine, table_name, name, keys, unique=True):
+                existing.append(keys)
+                created.append(name)
+
+        for cols in JOIN_INDEXES.get(layer, []):
+            if not set(cols) <= columns or _covered(cols, existing):
+                continue
+            name = _index_name(table_name, cols)
+            if _create_index(engine, table_name, name, cols):
+                existing.append(cols)
+                created.append(name)
+    return created
+
+
+def _create_index(engine, table_name: str, name: str, cols: list, unique: bool = False) -> bool:
+    """Creates one index on an existing table; warns and returns False on failure (e.g. duplicate keys)."""
+    table = Table(table_name, MetaData(), *(Column(c) for c in cols))
+    try:
+        Index(name, *(table.c[c] for c in cols), unique=unique).create(engine)
+    except SQLAlchemyError as e:
+        print(f"⚠️ Could not create index {name}: {e}")
+        return False
+    return True
+
+
+def check_drift(layer: str, df: pd.DataFrame, manifest: dict = None) -> dict:
+    """
+    Compares a freshly fetched layer frame with its manifest entry.
+    Returns {"missing", "unexpected", "type_mismatch"}; all empty means no drift.
+    """
+    manifest = manifest if manifest is not None else load_manifest()
+    spec = manifest[layer]
+    expected = spec["columns"]
+    samples = spec.get("sample_data", {})
+
+    mismatched = []
+    for col in expected:
+        if col not in df.columns or df[col].isna().all():
+            continue
+        numeric_expected = column_type(layer, col, samples.get(col)) is not Text
+        if numeric_expected != pd.api.types.is_numeric_dtype(df[col].dtype):
+            mismatched.append(col)
+
+    return {
+        "missing":       [col for col in expected if col not in df.columns],
+        "unexpected":    [col for col in df.columns if col not in expected],
+        "type_mismatch": mismatched,
+    }
@@ -1,13 +1,190 @@
-# db/upsert.py
+# upsert.py
 
+import io
+import re
+import time
+import sqlite3
+import threading
 import pandas as pd
-from sqlalchemy import MetaData, Table, inspect, and_
+from sqlalchemy import Integer, MetaData, Table, event, tuple_
+from sqlalchemy.exc import NoSuchTableError
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from db.session import engine
+from session import engine
+from table_schema import ensure_indexes
 
 metadata = MetaData()
 
+# Reflected tables keyed by (schema, table), so repeated upserts skip the catalog
+_tables = {}
+# Tables whose declared join indexes have been checked this process
+_indexed = set()
+_tables_lock = threading.Lock()
+
+_DDL = re.compile(r"^\s*(CREATE|ALTER|DROP|RENAME)\b", re.IGNORECASE)
+
+
+def invalidate_table(table_name: str = None, schema: str = None) -> None:
+    """
+    Forgets cached reflection for one table, or for every table when
+    table_name is None. Call after changing a table's DDL outside this engine.
+    """
+    with _tables_lock:
+        keys = list(_tables) if table_name is None else [(schema, table_name)]
+        for key in keys:
+            tbl = _tables.pop(key, None)
+            if tbl is not None:
+                metadata.remove(tbl)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _invalidate_on_ddl(conn, cursor, statement, parameters, context, executemany):
+    # Any DDL through the engine (to_sql's CREATE TABLE, migrations) drops the cache
+    if _DDL.match(statement):
+        invalidate_table()
+
+
+def get_table(table_name: str, schema: str = None):
+    """Cached reflected Table for (schema, table_name), or None if it does not exist."""
+    key = (schema, table_name)
+    with _tables_lock:
+        tbl = _tables.get(key)
+        if tbl is not None:
+            return tbl
+        try:
+            tbl = Table(table_name, metadata, autoload_with=engine, schema=schema)
+        except NoSuchTableError:
+            return None
+        _tables[key] = tbl
+        return tbl
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER (3.32+); delete_keys binds at most this many per IN list
+SQLITE_MAX_VARIABLES = 32766
+
+
+def _sqlite_rows(df: pd.DataFrame) -> list:
+    """Plain Python tuples for sqlite3: NaN -> NULL, timestamps in SQLAlchemy's text format."""
+    out = df.copy()
+    for col in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[col].dtype):
+            out[col] = out[col].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+    out = out.astype(object).where(out.notna(), None)
+    return list(out.itertuples(index=False, name=None))
+
+
+def _sqlite_upsert(df: pd.DataFrame, table_name: str, index_cols: list, schema: str = None) -> None:
+    """
+    Native SQLite upsert: a unique index on index_cols backs
+    INSERT ... ON CONFLICT DO UPDATE, run with one executemany under one
+    transaction (values are bound per row, so no chunking is needed).
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    table = quote(table_name) if schema is None else f"{quote(schema)}.{quote(table_name)}"
+    index_name = quote(f"ux_{table_name}_{'_'.join(index_cols)}")
+    if schema is not None:
+        index_name = f"{quote(schema)}.{index_name}"
+    keys = ", ".join(quote(col) for col in index_cols)
+
+    cols = list(df.columns)
+    updates = ", ".join(
+        f"{quote(col)} = excluded.{quote(col)}" for col in cols if col not in index_cols
+    )
+    sql = (
+        f"INSERT INTO {table} ({', '.join(quote(col) for col in cols)}) "
+        f"VALUES ({', '.join('?' for _ in cols)}) "
+        f"ON CONFLICT ({keys}) " + (f"DO UPDATE SET {updates}" if updates else "DO NOTHING")
+    )
+
+    rows = _sqlite_rows(df.drop_duplicates(subset=index_cols, keep="last"))
+
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        index_sql = f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {quote(table_name)} ({keys})"
+        try:
+            cursor.execute(index_sql)
+        except sqlite3.IntegrityError:
+            # Rows written by the old delete+insert path may repeat a key; keep the newest
+            cursor.execute(
+                f"DELETE FROM {table} WHERE rowid NOT IN "
+                f"(SELECT MAX(rowid) FROM {table} GROUP BY {keys})"
+            )
+            cursor.execute(index_sql)
+        cursor.executemany(sql, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+# Postgres frames at least this long go through COPY + staging-table merge
+PG_COPY_MIN_ROWS = 5000
+# Rows serialized per COPY chunk, bounding the CSV buffer held in memory
+PG_COPY_CHUNK_ROWS = 50000
+
+
+def _postgres_copy_upsert(df: pd.DataFrame, table_name: str, index_cols: list, schema: str = None) -> dict:
+    """
+    Streams df through COPY FROM STDIN into a temporary staging table, then
+    merges it with one INSERT ... SELECT ... ON CONFLICT DO UPDATE, all in
+    one transaction. Returns a {rows, copy_s, merge_s} report.
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    table = quote(table_name) if schema is None else f"{quote(schema)}.{quote(table_name)}"
+    stage = quote(f"stage_{table_name}")
+    cols = list(df.columns)
+    col_list = ", ".join(quote(col) for col in cols)
+    keys = ", ".join(quote(col) for col in index_cols)
+    updates = ", ".join(
+        f"{quote(col)} = EXCLUDED.{quote(col)}" for col in cols if col not in index_cols
+    )
+
+    # A key may only be touched once per INSERT ... ON CONFLICT statement
+    df = df.drop_duplicates(subset=index_cols, keep="last")
+
+    # Integer columns holding NaN arrive as float64 and would be written as
+    # "12.0", which COPY rejects for BIGINT; nullable Int64 writes "12"
+    tbl = get_table(table_name, schema)
+    int_cols = {
+        col: df[col].round().astype("Int64") for col in cols
+        if tbl is not None and col in tbl.c and isinstance(tbl.c[col].type, Integer)
+        and pd.api.types.is_float_dtype(df[col].dtype)
+    }
+    df = df.assign(**int_cols)
+
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        t0 = time.perf_counter()
+        cursor.execute(f"CREATE TEMP TABLE {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+        copy_sql = f"COPY {stage} ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        for i in range(0, len(df), PG_COPY_CHUNK_ROWS):
+            buf = io.StringIO()
+            df.iloc[i:i + PG_COPY_CHUNK_ROWS].to_csv(buf, index=False, header=False, na_rep="\\N")
+            buf.seek(0)
+            cursor.copy_expert(copy_sql, buf)
+        t1 = time.perf_counter()
+        cursor.execute(
+            f"INSERT INTO {table} ({col_list}) SELECT {col_list} FROM {stage} "
+            f"ON CONFLICT ({keys}) " + (f"DO UPDATE SET {updates}" if updates else "DO NOTHING")
+        )
+        conn.commit()
+        t2 = time.perf_counter()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    report = {"rows": len(df), "copy_s": round(t1 - t0, 3), "merge_s": round(t2 - t1, 3)}
+    print(
+        f"📥 {table_name}: {report['rows']} rows copied in {report['copy_s']:.2f}s, "
+        f"merged in {report['merge_s']:.2f}s ({report['rows'] / max(t2 - t0, 1e-9):,.0f} rows/s)"
+    )
+    return report
+
+
 def upsert_df(
     df: pd.DataFrame,
     table_name: str,
@@ -16,27 +193,30 @@ def upsert_df(
 ) -> None:
     """
     Upsert a DataFrame into a table.  
-    On SQLite: deletes+inserts.  
-    On Postgres: uses ON CONFLICT DO UPDATE.
+    On SQLite: INSERT ... ON CONFLICT DO UPDATE on a unique index over index_cols.  
+    On Postgres: uses ON CONFLICT DO UPDATE; frames of PG_COPY_MIN_ROWS or more
+    are streamed through COPY into a staging table and merged in one statement.
     """
-    inspector = inspect(engine)
-
-    if not inspector.has_table(table_name, schema=schema):
+    tbl = get_table(table_name, schema)
+    if tbl is None:
         df.head(0).to_sql(table_name, engine, index=False, schema=schema)
         print(f"🆕 Created table '{table_name}'")
+        tbl = get_table(table_name, schema)
 
-    tbl = Table(table_name, metadata, autoload_with=engine, schema=schema)
-    records = df.to_dict(orient="records")
+    if schema is None and table_name not in _indexed:
+        ensure_indexes(engine, [table_name])
+        _indexed.add(table_name)
 
     if engine.dialect.name == "sqlite":
-        with Session(engine) as session:
-            for rec in records:
-                cond = [tbl.c[col] == rec[col] for col in index_cols]
-                session.execute(tbl.delete().where(and_(*cond)))
-            session.execute(tbl.insert().values(records))
-            session.commit()
+        _sqlite_upsert(df, table_name, index_cols, schema)
         return
 
+    if len(df) >= PG_COPY_MIN_ROWS:
+        _postgres_copy_upsert(df, table_name, index_cols, schema)
+        return
+
+    records = df.to_dict(orient="records")
+
     stmt = insert(tbl).values(records)
     update_cols = {
         col.name: col
@@ -50,3 +230,32 @@ def upsert_df(
     with Session(engine) as session:
         session.execute(stmt)
         session.commit()
+
+
+def delete_keys(
+    keys: pd.DataFrame,
+    table_name: str,
+    index_cols: list,
+    schema: str = None
+) -> int:
+    """
+    Deletes the rows whose index_cols match a row of keys, in chunks under
+    one transaction. Returns the number of rows deleted.
+    """
+    tbl = get_table(table_name, schema)
+    if tbl is None or keys.empty:
+        return 0
+
+    key_frame = keys[index_cols].astype(object)
+    rows = list(key_frame.where(key_frame.notna(), None).itertuples(index=False, name=None))
+    cols = [tbl.c[col] for col in index_cols]
+    target = cols[0] if len(cols) == 1 else tuple_(*cols)
+    chunk = max(1, SQLITE_MAX_VARIABLES // len(index_cols))
+
+    deleted = 0
+    with engine.begin() as conn:
+        for i in range(0, len(rows), chunk):
+            batch = rows[i:i + chunk]
+            values = [r[0] for r in batch] if len(cols) == 1 else batch
+            deleted += conn.execute(tbl.delete().where(target.in_(values))).rowcount
+    return deleted